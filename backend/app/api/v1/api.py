@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, tasks, goals, wellness, health, chat, analytics
+from app.api.v1.endpoints import auth, tasks, goals, wellness, health, chat, analytics, events, search, jobs, dashboard
 
 api_router = APIRouter()
 
@@ -9,4 +9,8 @@ api_router.include_router(goals.router, prefix="/goals", tags=["goals"])
 api_router.include_router(wellness.router, prefix="/wellness", tags=["wellness"])
 api_router.include_router(health.router, prefix="/health", tags=["health"])
 api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
-api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
\ No newline at end of file
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
\ No newline at end of file
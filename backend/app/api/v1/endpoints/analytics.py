@@ -1,32 +1,33 @@
 from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi.concurrency import run_in_threadpool
 from typing import Dict, Any
 from app.api.v1.endpoints.auth import get_current_user
+from app.api.v1.endpoints.goals import fake_goals_db
+from app.api.v1.endpoints.tasks import fake_tasks_db
+from app.core.analytics import summarize_tasks, summarize_user
+from app.core.cache import analytics_cache
+from app.core.locks import write_locks
 from app.schemas.base import ApiResponse
 
 router = APIRouter()
 
 
+def compute_user_analytics(user_id: str) -> Dict[str, Any]:
+    return summarize_user(fake_tasks_db.iter_user(user_id), fake_goals_db.iter_user(user_id))
+
+
+def compute_task_analytics(user_id: str) -> Dict[str, Any]:
+    return summarize_tasks(fake_tasks_db.iter_user(user_id))
+
+
 @router.get("/user", response_model=ApiResponse[Dict[str, Any]])
 async def get_user_analytics(current_user: dict = Depends(get_current_user)):
     """Get user analytics and insights"""
     try:
-        # Mock analytics data - replace with actual calculations
-        analytics_data = {
-            "productivity_score": 85,
-            "tasks_completed_this_week": 12,
-            "goals_progress": 67,
-            "wellness_score": 78,
-            "health_score": 82,
-            "energy_levels": {
-                "average": 7.5,
-                "trend": "increasing"
-            },
-            "recommendations": [
-                "Consider taking more breaks during your afternoon sessions",
-                "Your morning productivity is highest - schedule important tasks then",
-                "You're consistently meeting your hydration goals - keep it up!"
-            ]
-        }
+        user_id = current_user["id"]
+        analytics_data = await analytics_cache.get_or_compute(
+            user_id, "user", lambda: run_in_threadpool(compute_user_analytics, user_id)
+        )
         
         return ApiResponse(
             data=analytics_data,
@@ -44,22 +45,10 @@ async def get_user_analytics(current_user: dict = Depends(get_current_user)):
 async def get_task_analytics(current_user: dict = Depends(get_current_user)):
     """Get task-specific analytics"""
     try:
-        # Mock task analytics - replace with actual calculations
-        task_analytics = {
-            "completion_rate": 78,
-            "average_completion_time": "2.5 hours",
-            "most_productive_time": "10:00 AM - 12:00 PM",
-            "task_categories": {
-                "daily": {"completed": 8, "total": 10},
-                "weekly": {"completed": 4, "total": 6},
-                "monthly": {"completed": 2, "total": 3}
-            },
-            "priority_distribution": {
-                "high": 25,
-                "medium": 45,
-                "low": 30
-            }
-        }
+        user_id = current_user["id"]
+        task_analytics = await analytics_cache.get_or_compute(
+            user_id, "tasks", lambda: run_in_threadpool(compute_task_analytics, user_id)
+        )
         
         return ApiResponse(
             data=task_analytics,
@@ -70,4 +59,24 @@ async def get_task_analytics(current_user: dict = Depends(get_current_user)):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/cache", response_model=ApiResponse[Dict[str, int]])
+async def get_analytics_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Get hit/miss and eviction counters for the analytics result cache"""
+    return ApiResponse(
+        data=analytics_cache.stats(),
+        message="Analytics cache stats retrieved successfully",
+        success=True
+    )
+
+
+@router.get("/locks", response_model=ApiResponse[Dict[str, Any]])
+async def get_write_lock_stats(current_user: dict = Depends(get_current_user)):
+    """Get contention counters for the striped write locks"""
+    return ApiResponse(
+        data=write_locks.stats(),
+        message="Write lock stats retrieved successfully",
+        success=True
+    )
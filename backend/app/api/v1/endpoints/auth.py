@@ -1,7 +1,10 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Header, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import timedelta
+from typing import Optional
 from app.core.config import settings
+from app.core.idempotency import idempotent_requests
+from app.core.store import get_store, run_store
 from app.core.security import create_access_token, verify_password, get_password_hash, verify_token
 from app.schemas.auth import LoginRequest, SignupRequest, UserResponse, TokenResponse
 from app.schemas.base import ApiResponse
@@ -11,7 +14,7 @@ security = HTTPBearer()
 
 
 # Mock user database - replace with actual database
-fake_users_db = {}
+fake_users_db = get_store("users")
 
 
 @router.post("/login", response_model=ApiResponse[TokenResponse])
@@ -19,14 +22,13 @@ async def login(login_data: LoginRequest):
     """Authenticate user and return access token"""
     try:
         # Check if user exists
-        if login_data.email not in fake_users_db:
+        user = await run_store(fake_users_db.get, login_data.email)
+        if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
             )
         
-        user = fake_users_db[login_data.email]
-        
         # Verify password
         if not verify_password(login_data.password, user["hashed_password"]):
             raise HTTPException(
@@ -64,11 +66,26 @@ async def login(login_data: LoginRequest):
 
 
 @router.post("/signup", response_model=ApiResponse[TokenResponse])
-async def signup(signup_data: SignupRequest):
+async def signup(
+    signup_data: SignupRequest,
+    idempotency_key: Optional[str] = Header(None)
+):
     """Register new user and return access token"""
+    # Retries with the same Idempotency-Key get the original response
+    # without hashing the password again, for as long as its token is valid
+    return await idempotent_requests.run(
+        (signup_data.email, "signup"),
+        idempotency_key,
+        signup_data,
+        lambda: _signup(signup_data),
+        ttl=min(settings.IDEMPOTENCY_TTL_SECONDS, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+    )
+
+
+async def _signup(signup_data: SignupRequest):
     try:
         # Check if user already exists
-        if signup_data.email in fake_users_db:
+        if await run_store(fake_users_db.__contains__, signup_data.email):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
@@ -81,13 +98,14 @@ async def signup(signup_data: SignupRequest):
         user_id = str(uuid.uuid4())
         hashed_password = get_password_hash(signup_data.password)
         
-        fake_users_db[signup_data.email] = {
+        user = {
             "id": user_id,
             "email": signup_data.email,
             "name": signup_data.name,
             "hashed_password": hashed_password,
             "created_at": datetime.utcnow().isoformat()
         }
+        await run_store(fake_users_db.__setitem__, signup_data.email, user)
         
         # Create access token
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -95,8 +113,6 @@ async def signup(signup_data: SignupRequest):
             data={"sub": signup_data.email}, expires_delta=access_token_expires
         )
         
-        user = fake_users_db[signup_data.email]
-        
         return ApiResponse(
             data=TokenResponse(
                 user=UserResponse(
@@ -139,7 +155,11 @@ async def logout(credentials: HTTPAuthorizationCredentials = Depends(security)):
 
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Get current authenticated user"""
-    token = credentials.credentials
+    return get_user_from_token(credentials.credentials)
+
+
+def get_user_from_token(token: str):
+    """Resolve an access token to its user"""
     payload = verify_token(token)
     email = payload.get("sub")
     
@@ -0,0 +1,64 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi.concurrency import run_in_threadpool
+from datetime import date as Date, datetime
+from typing import List, Optional
+from app.api.v1.endpoints.auth import get_current_user
+from app.api.v1.endpoints.analytics import compute_user_analytics
+from app.api.v1.endpoints.goals import fake_goals_db, with_forecasts
+from app.api.v1.endpoints.health import fake_health_db
+from app.api.v1.endpoints.tasks import fake_tasks_db
+from app.api.v1.endpoints.wellness import fake_wellness_db
+from app.core.bulk import get_daily_record
+from app.core.cache import analytics_cache
+from app.schemas.dashboard import DashboardResponse, DashboardSection
+from app.schemas.base import ApiResponse
+
+router = APIRouter()
+
+
+def _records_on(store, user_id: str, day: str) -> List[dict]:
+    record = get_daily_record(store, user_id, day)
+    return [record] if record is not None else []
+
+
+@router.get("/", response_model=ApiResponse[DashboardResponse])
+async def get_dashboard(
+    sections: Optional[List[DashboardSection]] = Query(None),
+    date: Optional[Date] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get tasks, goals, the day's wellness and health data and user analytics in one response"""
+    try:
+        user_id = current_user["id"]
+        day = (date or datetime.utcnow().date()).isoformat()
+        selected = set(sections or DashboardSection)
+        
+        # Store reads run in the threadpool so the sections load concurrently
+        loaders = {
+            DashboardSection.tasks: lambda: run_in_threadpool(fake_tasks_db.for_user, user_id),
+            DashboardSection.goals: lambda: run_in_threadpool(
+                lambda: list(with_forecasts(fake_goals_db.for_user(user_id), user_id))
+            ),
+            DashboardSection.wellness: lambda: run_in_threadpool(_records_on, fake_wellness_db, user_id, day),
+            DashboardSection.health: lambda: run_in_threadpool(_records_on, fake_health_db, user_id, day),
+            DashboardSection.analytics: lambda: analytics_cache.get_or_compute(
+                user_id, "user", lambda: run_in_threadpool(compute_user_analytics, user_id)
+            ),
+        }
+        names = [section for section in DashboardSection if section in selected]
+        results = await asyncio.gather(*(loaders[section]() for section in names))
+        
+        return ApiResponse(
+            data=DashboardResponse(
+                date=day,
+                **{section.value: result for section, result in zip(names, results)}
+            ),
+            message="Dashboard retrieved successfully",
+            success=True
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
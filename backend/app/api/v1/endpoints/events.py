@@ -0,0 +1,47 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, WebSocket, status
+from app.api.v1.endpoints.auth import get_user_from_token
+from app.core.events import hub
+from app.core.store import run_store
+
+router = APIRouter()
+
+
+@router.websocket("/ws")
+async def change_events(websocket: WebSocket, token: str):
+    """Push record change events for the authenticated user"""
+    # Browsers can't set headers on WebSocket requests, so the access token
+    # comes in the query string
+    try:
+        current_user = await run_store(get_user_from_token, token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    queue = hub.subscribe(current_user["id"])
+    
+    async def forward_events():
+        while True:
+            event = await queue.get()
+            await websocket.send_json(event)
+    
+    async def wait_for_disconnect():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+    
+    tasks = [
+        asyncio.create_task(forward_events()),
+        asyncio.create_task(wait_for_disconnect()),
+    ]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Collect the outcome of both tasks so a send that failed after the
+        # client went away isn't reported as a never-retrieved exception
+        await asyncio.gather(*tasks, return_exceptions=True)
+        hub.unsubscribe(current_user["id"], queue)
@@ -1,23 +1,71 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Header, status
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Optional
 from app.api.v1.endpoints.auth import get_current_user
-from app.schemas.goal import GoalCreate, GoalUpdate, GoalResponse
+from app.core.events import publish_change
+from app.core.forecast_batch import ForecastBatch
+from app.core.idempotency import idempotent_requests
+from app.core.locks import write_locks
+from app.core.store import get_store, run_store
+from app.core.streaming import stream_api_response
+from app.core.timeseries import add_point, new_series, series_points
+from app.schemas.goal import (
+    GoalCreate,
+    GoalUpdate,
+    GoalResponse,
+    GoalProgressCreate,
+    GoalProgressPoint,
+)
 from app.schemas.base import ApiResponse
 
 router = APIRouter()
 
 # Mock goals database - replace with actual database
-fake_goals_db = {}
+fake_goals_db = get_store("goals")
+
+# Downsampled progress history per goal, keyed by goal id
+fake_goal_progress_db = get_store("goal_progress")
+
+# Completion forecasts from the nightly batch, keyed by goal id
+fake_goal_forecasts_db = get_store("goal_forecasts")
+goal_forecasts = ForecastBatch(
+    fake_goals_db, fake_goal_progress_db, fake_goal_forecasts_db, get_store("batch_runs")
+)
+
+
+def record_progress(goal: dict, delta: float, timestamp: datetime) -> None:
+    """Append an increment to the goal's progress history"""
+    fake_goal_progress_db.apply(
+        goal["id"],
+        lambda record: add_point(record["series"], timestamp, delta, goal["current_value"]),
+        default={"id": goal["id"], "user_id": goal["user_id"], "series": new_series()},
+    )
+
+
+def with_forecasts(goals: Iterable[dict], user_id: str) -> Iterator[dict]:
+    """Attach the latest nightly forecast to each of the user's goals"""
+    forecasts = {forecast["id"]: forecast for forecast in fake_goal_forecasts_db.iter_user(user_id)}
+    for goal in goals:
+        yield {**goal, "forecast": forecasts.get(goal["id"])}
 
 
 @router.get("/", response_model=ApiResponse[List[GoalResponse]])
-async def get_goals(current_user: dict = Depends(get_current_user)):
+async def get_goals(
+    stream: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
     """Get all goals for the current user"""
     try:
-        user_goals = [
-            goal for goal in fake_goals_db.values() 
-            if goal["user_id"] == current_user["id"]
-        ]
+        if stream:
+            return stream_api_response(
+                with_forecasts(fake_goals_db.iter_user(current_user["id"]), current_user["id"]),
+                GoalResponse,
+                "Goals retrieved successfully"
+            )
+        
+        user_goals = await run_store(
+            lambda: list(with_forecasts(fake_goals_db.for_user(current_user["id"]), current_user["id"]))
+        )
         
         return ApiResponse(
             data=[GoalResponse(**goal) for goal in user_goals],
@@ -34,12 +82,21 @@ async def get_goals(current_user: dict = Depends(get_current_user)):
 @router.post("/", response_model=ApiResponse[GoalResponse])
 async def create_goal(
     goal_data: GoalCreate,
+    idempotency_key: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user)
 ):
-    """Create a new goal"""
+    """Create a new goal (retries with the same Idempotency-Key are replayed)"""
+    return await idempotent_requests.run(
+        (current_user["id"], "create_goal"),
+        idempotency_key,
+        goal_data,
+        lambda: _create_goal(goal_data, current_user)
+    )
+
+
+async def _create_goal(goal_data: GoalCreate, current_user: dict):
     try:
         import uuid
-        from datetime import datetime
         
         goal_id = str(uuid.uuid4())
         now = datetime.utcnow().isoformat()
@@ -57,7 +114,8 @@ async def create_goal(
             "updated_at": now
         }
         
-        fake_goals_db[goal_id] = new_goal
+        await run_store(fake_goals_db.__setitem__, goal_id, new_goal)
+        await publish_change(current_user["id"], "goals", "upsert", new_goal)
         
         return ApiResponse(
             data=GoalResponse(**new_goal),
@@ -79,34 +137,137 @@ async def update_goal(
 ):
     """Update a goal"""
     try:
-        if goal_id not in fake_goals_db:
+        update_data = goal_updates.dict(exclude_unset=True)
+        if "deadline" in update_data and update_data["deadline"]:
+            update_data["deadline"] = update_data["deadline"].isoformat()
+        
+        previous_value = None
+        now = None
+        
+        def update(goal: dict) -> None:
+            nonlocal previous_value, now
+            # Check if user owns the goal
+            if goal["user_id"] != current_user["id"]:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not authorized to update this goal"
+                )
+            
+            previous_value = goal["current_value"]
+            now = datetime.utcnow()
+            goal.update(update_data)
+            goal["updated_at"] = now.isoformat()
+        
+        # Through apply(), so an increment from another worker can't be lost
+        try:
+            async with write_locks.hold("goals", goal_id):
+                goal = await run_store(fake_goals_db.apply, goal_id, update)
+        except KeyError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Goal not found"
+            )
+        
+        await publish_change(current_user["id"], "goals", "upsert", goal)
+        if goal["current_value"] != previous_value:
+            await run_store(record_progress, goal, goal["current_value"] - previous_value, now)
+        
+        return ApiResponse(
+            data=GoalResponse(**goal),
+            message="Goal updated successfully",
+            success=True
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.post("/{goal_id}/progress", response_model=ApiResponse[GoalResponse])
+async def add_goal_progress(
+    goal_id: str,
+    progress: GoalProgressCreate,
+    current_user: dict = Depends(get_current_user)
+):
+    """Atomically add a delta to a goal's current value"""
+    try:
+        now = None
+        
+        def increment(goal: dict) -> None:
+            nonlocal now
+            # Check if user owns the goal
+            if goal["user_id"] != current_user["id"]:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not authorized to update this goal"
+                )
+            
+            # Timestamped inside the write, so history order follows value order
+            now = datetime.utcnow()
+            goal["current_value"] += progress.delta
+            goal["updated_at"] = now.isoformat()
+        
+        try:
+            async with write_locks.hold("goals", goal_id):
+                goal = await run_store(fake_goals_db.apply, goal_id, increment)
+        except KeyError:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Goal not found"
             )
         
-        goal = fake_goals_db[goal_id]
+        await run_store(record_progress, goal, progress.delta, now)
+        await publish_change(current_user["id"], "goals", "upsert", goal)
+        
+        return ApiResponse(
+            data=GoalResponse(**goal),
+            message="Goal progress updated successfully",
+            success=True
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.get("/{goal_id}/progress", response_model=ApiResponse[List[GoalProgressPoint]])
+async def get_goal_progress(
+    goal_id: str,
+    since: Optional[datetime] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get a goal's progress history, downsampled for older periods"""
+    try:
+        goal = await run_store(fake_goals_db.get, goal_id)
+        if goal is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Goal not found"
+            )
         
         # Check if user owns the goal
         if goal["user_id"] != current_user["id"]:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to update this goal"
+                detail="Not authorized to view this goal"
             )
         
-        # Update goal
-        from datetime import datetime
-        update_data = goal_updates.dict(exclude_unset=True)
+        # History timestamps are naive UTC
+        if since and since.tzinfo:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
         
-        if "deadline" in update_data and update_data["deadline"]:
-            update_data["deadline"] = update_data["deadline"].isoformat()
-        
-        goal.update(update_data)
-        goal["updated_at"] = datetime.utcnow().isoformat()
+        record = await run_store(fake_goal_progress_db.get, goal_id)
+        points = series_points(record["series"], since) if record else []
         
         return ApiResponse(
-            data=GoalResponse(**goal),
-            message="Goal updated successfully",
+            data=[GoalProgressPoint(**point) for point in points],
+            message="Goal progress retrieved successfully",
             success=True
         )
     except HTTPException:
@@ -115,4 +276,4 @@ async def update_goal(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
-        )
\ No newline at end of file
+        )
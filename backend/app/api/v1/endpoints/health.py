@@ -1,26 +1,48 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi.responses import StreamingResponse
+from datetime import date as Date
 from typing import List, Optional
 from app.api.v1.endpoints.auth import get_current_user
+from app.core.bulk import export_daily_records, import_daily_records, upsert_daily_record
+from app.core.events import publish_change
+from app.core.locks import write_locks
+from app.core.rollups import backfill_rollups, get_rollups, update_rollups
+from app.core.store import get_store, run_store
+from app.core.streaming import stream_api_response
+from app.schemas.bulk import BulkImportResponse, ExportFormat
+from app.schemas.rollup import RollupPeriod, RollupResponse
 from app.schemas.health import HealthDataCreate, HealthDataResponse
 from app.schemas.base import ApiResponse
 
 router = APIRouter()
 
 # Mock health database - replace with actual database
-fake_health_db = {}
+fake_health_db = get_store("health")
+
+# Weekly and monthly rollups of the daily records
+fake_health_rollups_db = get_store("health_rollups")
+HEALTH_METRICS = [field for field in HealthDataCreate.model_fields if field != "date"]
 
 
 @router.get("/", response_model=ApiResponse[List[HealthDataResponse]])
 async def get_health_data(
     date: Optional[str] = None,
+    stream: bool = False,
     current_user: dict = Depends(get_current_user)
 ):
     """Get health data for the current user"""
     try:
-        user_health = [
-            data for data in fake_health_db.values() 
-            if data["user_id"] == current_user["id"]
-        ]
+        if stream:
+            records = fake_health_db.iter_user(current_user["id"])
+            if date:
+                records = (data for data in records if data["date"] == date)
+            return stream_api_response(
+                records,
+                HealthDataResponse,
+                "Health data retrieved successfully"
+            )
+        
+        user_health = await run_store(fake_health_db.for_user, current_user["id"])
         
         if date:
             user_health = [data for data in user_health if data["date"] == date]
@@ -44,43 +66,94 @@ async def update_health_data(
 ):
     """Create or update health data for a specific date"""
     try:
-        import uuid
-        
-        # Check if data exists for this date
-        existing_data = None
-        for data in fake_health_db.values():
-            if data["user_id"] == current_user["id"] and data["date"] == health_data.date:
-                existing_data = data
-                break
+        # The record is keyed by user and date and written through apply(),
+        # so concurrent posts of one date (from any worker) can't duplicate it
+        data, created = await run_store(
+            upsert_daily_record, fake_health_db, current_user["id"], health_data.dict()
+        )
+        await run_store(update_rollups, fake_health_rollups_db, current_user["id"], [data], HEALTH_METRICS)
+        await publish_change(current_user["id"], "health", "upsert", data)
         
-        if existing_data:
-            # Update existing data
-            update_data = health_data.dict(exclude_unset=True)
-            existing_data.update(update_data)
-            
-            return ApiResponse(
-                data=HealthDataResponse(**existing_data),
-                message="Health data updated successfully",
-                success=True
-            )
-        else:
-            # Create new data
-            data_id = str(uuid.uuid4())
-            new_data = {
-                "id": data_id,
-                "user_id": current_user["id"],
-                **health_data.dict()
-            }
-            
-            fake_health_db[data_id] = new_data
-            
-            return ApiResponse(
-                data=HealthDataResponse(**new_data),
-                message="Health data created successfully",
-                success=True
+        return ApiResponse(
+            data=HealthDataResponse(**data),
+            message="Health data created successfully" if created else "Health data updated successfully",
+            success=True
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.post("/import", response_model=ApiResponse[BulkImportResponse])
+async def import_health_data(
+    request: Request,
+    current_user: dict = Depends(get_current_user)
+):
+    """Bulk create or update health data from a streamed NDJSON or CSV body"""
+    try:
+        async with write_locks.hold("health", current_user["id"]):
+            result = await import_daily_records(
+                request,
+                fake_health_db,
+                current_user["id"],
+                HealthDataCreate,
+                on_write=lambda records: update_rollups(
+                    fake_health_rollups_db, current_user["id"], records, HEALTH_METRICS
+                )
             )
+            await publish_change(current_user["id"], "health", "resync")
+        
+        return ApiResponse(
+            data=result,
+            message="Health data imported successfully",
+            success=True
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/rollup", response_model=ApiResponse[List[RollupResponse]])
+async def get_health_rollup(
+    period: RollupPeriod = RollupPeriod.week,
+    start: Optional[Date] = None,
+    end: Optional[Date] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get weekly or monthly health aggregates (sum, mean, min, max, count per metric)"""
+    try:
+        await run_store(backfill_rollups, fake_health_db, fake_health_rollups_db, current_user["id"], HEALTH_METRICS)
+        rollups = await run_store(
+            get_rollups, fake_health_rollups_db, current_user["id"], period.value, start, end
+        )
+        
+        return ApiResponse(
+            data=[RollupResponse(**rollup) for rollup in rollups],
+            message="Health rollups retrieved successfully",
+            success=True
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.get("/export")
+async def export_health_data(
+    format: ExportFormat = ExportFormat.ndjson,
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream all health data for the current user as NDJSON or CSV"""
+    media_type = "text/csv" if format == ExportFormat.csv else "application/x-ndjson"
+    fields = list(HealthDataResponse.model_fields)
+    
+    return StreamingResponse(
+        export_daily_records(fake_health_db, current_user["id"], fields, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=health.{format.value}"}
+    )
@@ -0,0 +1,120 @@
+from fastapi import APIRouter, HTTPException, Depends, status
+from app.api.v1.endpoints.auth import get_current_user
+from app.api.v1.endpoints.goals import fake_goals_db
+from app.api.v1.endpoints.tasks import fake_tasks_db
+from app.core.jobs import job_runner
+from app.core.store import run_store
+from app.schemas.job import JobCreate, JobResponse
+from app.schemas.base import ApiResponse
+
+router = APIRouter()
+
+
+async def _get_own_job(job_id: str, current_user: dict) -> dict:
+    job = await run_store(job_runner.store.get, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    # Check if user owns the job
+    if job["user_id"] != current_user["id"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this job"
+        )
+    
+    return job
+
+
+@router.post("/", response_model=ApiResponse[JobResponse])
+async def submit_job(
+    job_data: JobCreate,
+    current_user: dict = Depends(get_current_user)
+):
+    """Queue a background computation over the current user's data"""
+    try:
+        # Jobs run in worker processes that can't read the stores, so the
+        # input is captured now
+        args = {
+            "tasks": await run_store(fake_tasks_db.for_user, current_user["id"]),
+            "goals": await run_store(fake_goals_db.for_user, current_user["id"]),
+        }
+        
+        try:
+            job = await job_runner.submit(
+                current_user["id"], job_data.kind.value, job_data.priority.value, args
+            )
+        except RuntimeError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Job runner is shutting down"
+            )
+        
+        return ApiResponse(
+            data=JobResponse(**job),
+            message="Job queued successfully",
+            success=True
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.get("/{job_id}", response_model=ApiResponse[JobResponse])
+async def get_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get a job's status and, once finished, its result"""
+    try:
+        job = await _get_own_job(job_id, current_user)
+        
+        return ApiResponse(
+            data=JobResponse(**job),
+            message="Job retrieved successfully",
+            success=True
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.delete("/{job_id}", response_model=ApiResponse[JobResponse])
+async def cancel_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Cancel a job that hasn't started yet"""
+    try:
+        await _get_own_job(job_id, current_user)
+        
+        try:
+            job = await job_runner.cancel(job_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Job has already started"
+            )
+        
+        return ApiResponse(
+            data=JobResponse(**job),
+            message="Job cancelled successfully",
+            success=True
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from typing import List
+from app.api.v1.endpoints.auth import get_current_user
+from app.api.v1.endpoints.goals import fake_goals_db
+from app.api.v1.endpoints.tasks import fake_tasks_db
+from app.core.cache import get_data_version
+from app.core.search import search_index
+from app.schemas.search import SearchResult
+from app.schemas.base import ApiResponse
+
+router = APIRouter()
+
+
+@router.get("/", response_model=ApiResponse[List[SearchResult]])
+async def search(
+    q: str,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user)
+):
+    """Search the current user's tasks and goals by keyword or prefix"""
+    try:
+        user_id = current_user["id"]
+        
+        def load():
+            for task in fake_tasks_db.iter_user(user_id):
+                yield "tasks", task
+            for goal in fake_goals_db.iter_user(user_id):
+                yield "goals", goal
+        
+        results = await search_index.search(
+            user_id, q, limit, lambda: get_data_version(user_id), load
+        )
+        
+        return ApiResponse(
+            data=[SearchResult(**result) for result in results],
+            message="Search results retrieved successfully",
+            success=True
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
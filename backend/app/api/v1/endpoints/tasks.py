@@ -1,23 +1,35 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Header, status
+from typing import List, Optional
 from app.api.v1.endpoints.auth import get_current_user
+from app.core.events import publish_change
+from app.core.idempotency import idempotent_requests
+from app.core.locks import write_locks
+from app.core.store import get_store, run_store
+from app.core.streaming import stream_api_response
 from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
 from app.schemas.base import ApiResponse
 
 router = APIRouter()
 
 # Mock tasks database - replace with actual database
-fake_tasks_db = {}
+fake_tasks_db = get_store("tasks")
 
 
 @router.get("/", response_model=ApiResponse[List[TaskResponse]])
-async def get_tasks(current_user: dict = Depends(get_current_user)):
+async def get_tasks(
+    stream: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
     """Get all tasks for the current user"""
     try:
-        user_tasks = [
-            task for task in fake_tasks_db.values() 
-            if task["user_id"] == current_user["id"]
-        ]
+        if stream:
+            return stream_api_response(
+                fake_tasks_db.iter_user(current_user["id"]),
+                TaskResponse,
+                "Tasks retrieved successfully"
+            )
+        
+        user_tasks = await run_store(fake_tasks_db.for_user, current_user["id"])
         
         return ApiResponse(
             data=[TaskResponse(**task) for task in user_tasks],
@@ -34,9 +46,19 @@ async def get_tasks(current_user: dict = Depends(get_current_user)):
 @router.post("/", response_model=ApiResponse[TaskResponse])
 async def create_task(
     task_data: TaskCreate,
+    idempotency_key: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user)
 ):
-    """Create a new task"""
+    """Create a new task (retries with the same Idempotency-Key are replayed)"""
+    return await idempotent_requests.run(
+        (current_user["id"], "create_task"),
+        idempotency_key,
+        task_data,
+        lambda: _create_task(task_data, current_user)
+    )
+
+
+async def _create_task(task_data: TaskCreate, current_user: dict):
     try:
         import uuid
         from datetime import datetime
@@ -57,7 +79,8 @@ async def create_task(
             "updated_at": now
         }
         
-        fake_tasks_db[task_id] = new_task
+        await run_store(fake_tasks_db.__setitem__, task_id, new_task)
+        await publish_change(current_user["id"], "tasks", "upsert", new_task)
         
         return ApiResponse(
             data=TaskResponse(**new_task),
@@ -79,36 +102,38 @@ async def update_task(
 ):
     """Update a task"""
     try:
-        if task_id not in fake_tasks_db:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Task not found"
+        async with write_locks.hold("tasks", task_id):
+            task = await run_store(fake_tasks_db.get, task_id)
+            if task is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Task not found"
+                )
+            
+            # Check if user owns the task
+            if task["user_id"] != current_user["id"]:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not authorized to update this task"
+                )
+            
+            # Update task
+            from datetime import datetime
+            update_data = task_updates.dict(exclude_unset=True)
+            
+            if "due_date" in update_data and update_data["due_date"]:
+                update_data["due_date"] = update_data["due_date"].isoformat()
+            
+            task.update(update_data)
+            task["updated_at"] = datetime.utcnow().isoformat()
+            await run_store(fake_tasks_db.__setitem__, task_id, task)
+            await publish_change(current_user["id"], "tasks", "upsert", task)
+            
+            return ApiResponse(
+                data=TaskResponse(**task),
+                message="Task updated successfully",
+                success=True
             )
-        
-        task = fake_tasks_db[task_id]
-        
-        # Check if user owns the task
-        if task["user_id"] != current_user["id"]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to update this task"
-            )
-        
-        # Update task
-        from datetime import datetime
-        update_data = task_updates.dict(exclude_unset=True)
-        
-        if "due_date" in update_data and update_data["due_date"]:
-            update_data["due_date"] = update_data["due_date"].isoformat()
-        
-        task.update(update_data)
-        task["updated_at"] = datetime.utcnow().isoformat()
-        
-        return ApiResponse(
-            data=TaskResponse(**task),
-            message="Task updated successfully",
-            success=True
-        )
     except HTTPException:
         raise
     except Exception as e:
@@ -125,28 +150,29 @@ async def delete_task(
 ):
     """Delete a task"""
     try:
-        if task_id not in fake_tasks_db:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Task not found"
-            )
-        
-        task = fake_tasks_db[task_id]
-        
-        # Check if user owns the task
-        if task["user_id"] != current_user["id"]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to delete this task"
+        async with write_locks.hold("tasks", task_id):
+            task = await run_store(fake_tasks_db.get, task_id)
+            if task is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Task not found"
+                )
+            
+            # Check if user owns the task
+            if task["user_id"] != current_user["id"]:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not authorized to delete this task"
+                )
+            
+            await run_store(fake_tasks_db.__delitem__, task_id)
+            await publish_change(current_user["id"], "tasks", "delete", task)
+            
+            return ApiResponse(
+                data=None,
+                message="Task deleted successfully",
+                success=True
             )
-        
-        del fake_tasks_db[task_id]
-        
-        return ApiResponse(
-            data=None,
-            message="Task deleted successfully",
-            success=True
-        )
     except HTTPException:
         raise
     except Exception as e:
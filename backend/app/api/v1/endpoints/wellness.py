@@ -1,26 +1,48 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi.responses import StreamingResponse
+from datetime import date as Date
 from typing import List, Optional
 from app.api.v1.endpoints.auth import get_current_user
+from app.core.bulk import export_daily_records, import_daily_records, upsert_daily_record
+from app.core.events import publish_change
+from app.core.locks import write_locks
+from app.core.rollups import backfill_rollups, get_rollups, update_rollups
+from app.core.store import get_store, run_store
+from app.core.streaming import stream_api_response
+from app.schemas.bulk import BulkImportResponse, ExportFormat
+from app.schemas.rollup import RollupPeriod, RollupResponse
 from app.schemas.wellness import WellnessDataCreate, WellnessDataResponse
 from app.schemas.base import ApiResponse
 
 router = APIRouter()
 
 # Mock wellness database - replace with actual database
-fake_wellness_db = {}
+fake_wellness_db = get_store("wellness")
+
+# Weekly and monthly rollups of the daily records
+fake_wellness_rollups_db = get_store("wellness_rollups")
+WELLNESS_METRICS = [field for field in WellnessDataCreate.model_fields if field != "date"]
 
 
 @router.get("/", response_model=ApiResponse[List[WellnessDataResponse]])
 async def get_wellness_data(
     date: Optional[str] = None,
+    stream: bool = False,
     current_user: dict = Depends(get_current_user)
 ):
     """Get wellness data for the current user"""
     try:
-        user_wellness = [
-            data for data in fake_wellness_db.values() 
-            if data["user_id"] == current_user["id"]
-        ]
+        if stream:
+            records = fake_wellness_db.iter_user(current_user["id"])
+            if date:
+                records = (data for data in records if data["date"] == date)
+            return stream_api_response(
+                records,
+                WellnessDataResponse,
+                "Wellness data retrieved successfully"
+            )
+        
+        user_wellness = await run_store(fake_wellness_db.for_user, current_user["id"])
         
         if date:
             user_wellness = [data for data in user_wellness if data["date"] == date]
@@ -44,43 +66,94 @@ async def update_wellness_data(
 ):
     """Create or update wellness data for a specific date"""
     try:
-        import uuid
-        
-        # Check if data exists for this date
-        existing_data = None
-        for data in fake_wellness_db.values():
-            if data["user_id"] == current_user["id"] and data["date"] == wellness_data.date:
-                existing_data = data
-                break
+        # The record is keyed by user and date and written through apply(),
+        # so concurrent posts of one date (from any worker) can't duplicate it
+        data, created = await run_store(
+            upsert_daily_record, fake_wellness_db, current_user["id"], wellness_data.dict()
+        )
+        await run_store(update_rollups, fake_wellness_rollups_db, current_user["id"], [data], WELLNESS_METRICS)
+        await publish_change(current_user["id"], "wellness", "upsert", data)
         
-        if existing_data:
-            # Update existing data
-            update_data = wellness_data.dict(exclude_unset=True)
-            existing_data.update(update_data)
-            
-            return ApiResponse(
-                data=WellnessDataResponse(**existing_data),
-                message="Wellness data updated successfully",
-                success=True
-            )
-        else:
-            # Create new data
-            data_id = str(uuid.uuid4())
-            new_data = {
-                "id": data_id,
-                "user_id": current_user["id"],
-                **wellness_data.dict()
-            }
-            
-            fake_wellness_db[data_id] = new_data
-            
-            return ApiResponse(
-                data=WellnessDataResponse(**new_data),
-                message="Wellness data created successfully",
-                success=True
+        return ApiResponse(
+            data=WellnessDataResponse(**data),
+            message="Wellness data created successfully" if created else "Wellness data updated successfully",
+            success=True
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.post("/import", response_model=ApiResponse[BulkImportResponse])
+async def import_wellness_data(
+    request: Request,
+    current_user: dict = Depends(get_current_user)
+):
+    """Bulk create or update wellness data from a streamed NDJSON or CSV body"""
+    try:
+        async with write_locks.hold("wellness", current_user["id"]):
+            result = await import_daily_records(
+                request,
+                fake_wellness_db,
+                current_user["id"],
+                WellnessDataCreate,
+                on_write=lambda records: update_rollups(
+                    fake_wellness_rollups_db, current_user["id"], records, WELLNESS_METRICS
+                )
             )
+            await publish_change(current_user["id"], "wellness", "resync")
+        
+        return ApiResponse(
+            data=result,
+            message="Wellness data imported successfully",
+            success=True
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/rollup", response_model=ApiResponse[List[RollupResponse]])
+async def get_wellness_rollup(
+    period: RollupPeriod = RollupPeriod.week,
+    start: Optional[Date] = None,
+    end: Optional[Date] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get weekly or monthly wellness aggregates (sum, mean, min, max, count per metric)"""
+    try:
+        await run_store(backfill_rollups, fake_wellness_db, fake_wellness_rollups_db, current_user["id"], WELLNESS_METRICS)
+        rollups = await run_store(
+            get_rollups, fake_wellness_rollups_db, current_user["id"], period.value, start, end
+        )
+        
+        return ApiResponse(
+            data=[RollupResponse(**rollup) for rollup in rollups],
+            message="Wellness rollups retrieved successfully",
+            success=True
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.get("/export")
+async def export_wellness_data(
+    format: ExportFormat = ExportFormat.ndjson,
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream all wellness data for the current user as NDJSON or CSV"""
+    media_type = "text/csv" if format == ExportFormat.csv else "application/x-ndjson"
+    fields = list(WellnessDataResponse.model_fields)
+    
+    return StreamingResponse(
+        export_daily_records(fake_wellness_db, current_user["id"], fields, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=wellness.{format.value}"}
+    )
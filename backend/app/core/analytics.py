@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable
+
+# Pure analytics computations over plain records. They import nothing that
+# opens stores, so they can run in job worker processes as well as in
+# request handlers.
+
+
+def summarize_user(tasks: Iterable[dict], goals: Iterable[dict]) -> Dict[str, Any]:
+    week_ago = (datetime.utcnow() - timedelta(days=7)).isoformat()
+    tasks_completed_this_week = sum(
+        1 for task in tasks
+        if task["completed"] and task["updated_at"] >= week_ago
+    )
+    
+    # Average completion across goals, each capped at 100%
+    completion = [
+        min(1.0, max(0.0, goal["current_value"] / goal["target_value"]))
+        for goal in goals if goal["target_value"] > 0
+    ]
+    goals_progress = round(100 * sum(completion) / len(completion)) if completion else 0
+    
+    # Mock analytics data - replace with actual calculations
+    return {
+        "productivity_score": 85,
+        "tasks_completed_this_week": tasks_completed_this_week,
+        "goals_progress": goals_progress,
+        "wellness_score": 78,
+        "health_score": 82,
+        "energy_levels": {
+            "average": 7.5,
+            "trend": "increasing"
+        },
+        "recommendations": [
+            "Consider taking more breaks during your afternoon sessions",
+            "Your morning productivity is highest - schedule important tasks then",
+            "You're consistently meeting your hydration goals - keep it up!"
+        ]
+    }
+
+
+def summarize_tasks(tasks: Iterable[dict]) -> Dict[str, Any]:
+    total = 0
+    completed = 0
+    categories = {category: {"completed": 0, "total": 0} for category in ("daily", "weekly", "monthly")}
+    priorities = {priority: 0 for priority in ("high", "medium", "low")}
+    
+    for task in tasks:
+        total += 1
+        completed += task["completed"]
+        categories[task["category"]]["total"] += 1
+        categories[task["category"]]["completed"] += task["completed"]
+        priorities[task["priority"]] += 1
+    
+    return {
+        "completion_rate": round(100 * completed / total) if total else 0,
+        # Mock timing data - needs completion timestamps
+        "average_completion_time": "2.5 hours",
+        "most_productive_time": "10:00 AM - 12:00 PM",
+        "task_categories": categories,
+        "priority_distribution": {
+            priority: round(100 * count / total) if total else 0
+            for priority, count in priorities.items()
+        }
+    }
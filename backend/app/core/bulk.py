@@ -0,0 +1,213 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Set, Tuple, Type
+from fastapi import Request
+from pydantic import BaseModel, ValidationError
+from app.core.config import settings
+from app.core.store import run_store
+from app.schemas.bulk import BulkImportResponse, ExportFormat
+
+# Streaming import/export of per-day records (health, wellness). Rows are
+# parsed, validated and written a chunk at a time, so memory stays bounded by
+# BULK_CHUNK_SIZE rather than by the size of the upload or the history.
+#
+# Day records are keyed by user and date, so concurrent upserts of the same
+# date, from any worker, always land on the same record. Records stored under
+# the random ids used before are moved to their date key when next written.
+
+MAX_REPORTED_ERRORS = 20
+
+# (collection, user) pairs known to have no records left under random ids.
+# New records always get date keys, so a clean scan never has to be repeated.
+_without_legacy: Set[Tuple[str, str]] = set()
+
+
+def daily_record_key(user_id: str, date: str) -> str:
+    return f"{user_id}:{date}"
+
+
+def _legacy_records(store, user_id: str) -> Iterator[dict]:
+    """Yield the user's records still stored under a random id"""
+    if (store.name, user_id) in _without_legacy:
+        return
+    found = False
+    for record in store.iter_user(user_id):
+        if record["id"] != daily_record_key(user_id, record["date"]):
+            found = True
+            yield record
+    if not found:
+        _without_legacy.add((store.name, user_id))
+
+
+def get_daily_record(store, user_id: str, date: str) -> Optional[dict]:
+    """Return the user's record for `date`, if any"""
+    record = store.get(daily_record_key(user_id, date))
+    if record is None:
+        record = next(
+            (legacy for legacy in _legacy_records(store, user_id) if legacy["date"] == date),
+            None
+        )
+    return record
+
+
+def upsert_daily_record(store, user_id: str, data: dict) -> Tuple[dict, bool]:
+    """Atomically create or update the user's record for `data["date"]`.
+
+    Returns the stored record and whether it was created.
+    """
+    key = daily_record_key(user_id, data["date"])
+    legacy = None
+    if key not in store:
+        legacy = next(
+            (record for record in _legacy_records(store, user_id) if record["date"] == data["date"]),
+            None
+        )
+    created = False
+
+    def upsert(record: dict) -> None:
+        nonlocal created
+        created = "date" not in record
+        record.update(data)
+        record["id"] = key
+
+    record = store.apply(key, upsert, default=legacy or {"user_id": user_id})
+    if legacy is not None:
+        store.pop(legacy["id"], None)
+    return record, created
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+async def import_daily_records(
+    request: Request,
+    store,
+    user_id: str,
+    schema: Type[BaseModel],
+    on_write: Optional[Callable[[List[dict]], None]] = None,
+) -> BulkImportResponse:
+    """Upsert NDJSON or CSV rows from the request body, one record per date.
+
+    `on_write` is called with each chunk of records after it is stored.
+    """
+    is_csv = "csv" in request.headers.get("content-type", "")
+    # Records still under a pre-migration random id can only be found by date
+    # with a scan of the user's history, which chunks skip if there are none
+    has_legacy = await run_store(lambda: any(True for _ in _legacy_records(store, user_id)))
+    result = BulkImportResponse(created=0, updated=0, skipped=0, errors=[])
+    pending: Dict[str, dict] = {}
+    header = None
+    line_number = 0
+
+    async for line in _iter_lines(request):
+        line_number += 1
+        text = line.decode("utf-8", errors="replace").strip()
+        if not text:
+            continue
+
+        try:
+            if is_csv:
+                values = next(csv.reader([text]))
+                if header is None:
+                    header = values
+                    continue
+                row = dict(zip(header, values))
+            else:
+                row = json.loads(text)
+            data = schema(**row).dict()
+        except ValidationError as e:
+            result.skipped += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                fields = "; ".join(
+                    f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()
+                )
+                result.errors.append(f"Line {line_number}: {fields}")
+            continue
+        except (ValueError, TypeError) as e:
+            result.skipped += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append(f"Line {line_number}: {e}")
+            continue
+
+        record_id = daily_record_key(user_id, data["date"])
+        if record_id in pending:
+            # The same date earlier in this chunk
+            result.updated += 1
+        pending[record_id] = {"id": record_id, "user_id": user_id, **data}
+
+        if len(pending) >= settings.BULK_CHUNK_SIZE:
+            await run_store(_write_chunk, store, user_id, pending, has_legacy, result, on_write)
+            pending = {}
+
+    if pending:
+        await run_store(_write_chunk, store, user_id, pending, has_legacy, result, on_write)
+    return result
+
+
+def _write_chunk(
+    store,
+    user_id: str,
+    pending: Dict[str, dict],
+    has_legacy: bool,
+    result: BulkImportResponse,
+    on_write: Optional[Callable[[List[dict]], None]],
+) -> None:
+    existing = store.get_many(list(pending))
+    legacy_ids = []
+    if has_legacy and len(existing) < len(pending):
+        missing_dates = {
+            record["date"] for key, record in pending.items() if key not in existing
+        }
+        for record in _legacy_records(store, user_id):
+            if record["date"] in missing_dates:
+                legacy_ids.append(record["id"])
+                missing_dates.discard(record["date"])
+
+    updated = len(existing) + len(legacy_ids)
+    result.updated += updated
+    result.created += len(pending) - updated
+
+    store.put_many(pending)
+    for legacy_id in legacy_ids:
+        store.pop(legacy_id, None)
+    if on_write is not None:
+        on_write(list(pending.values()))
+
+
+def export_daily_records(
+    store,
+    user_id: str,
+    fields: List[str],
+    format: ExportFormat,
+) -> Iterator[str]:
+    """Yield a user's records as NDJSON or CSV, a chunk of rows at a time"""
+    buffer = io.StringIO()
+    writer = None
+    if format == ExportFormat.csv:
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+
+    rows = 0
+    for record in store.iter_user(user_id):
+        if writer is not None:
+            writer.writerow([record.get(field) for field in fields])
+        else:
+            buffer.write(json.dumps({field: record.get(field) for field in fields}))
+            buffer.write("\n")
+        rows += 1
+        if rows % settings.BULK_CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
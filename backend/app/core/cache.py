@@ -0,0 +1,118 @@
+import asyncio
+import json
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from app.core.config import settings
+from app.core.store import get_store, run_store
+
+# Per-user data version, bumped on every task, goal, health and wellness
+# mutation. Cached results remember the version they were computed from, so
+# invalidating a user's results is a single counter increment.
+data_versions_db = get_store("data_versions")
+
+
+def get_data_version(user_id: str) -> int:
+    record = data_versions_db.get(user_id)
+    return record["version"] if record else 0
+
+
+def bump_data_version(user_id: str) -> int:
+    def increment(record: dict) -> None:
+        record["version"] += 1
+
+    record = data_versions_db.apply(
+        user_id,
+        increment,
+        default={"id": user_id, "user_id": user_id, "version": 0},
+    )
+    return record["version"]
+
+
+class ResultCache:
+    """LRU cache of computed per-user results with a memory budget.
+
+    Entries are keyed by (user_id, name) and tagged with the data version
+    they were computed from; an entry from an older version counts as a
+    miss and is replaced. Concurrent misses for the same key share a single
+    computation instead of stampeding.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        self._size = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[int, Any, int]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str, int], asyncio.Future] = {}
+
+    async def get_or_compute(
+        self,
+        user_id: str,
+        name: str,
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        version = await run_store(get_data_version, user_id)
+        key = (user_id, name)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        inflight = self._inflight.get((user_id, name, version))
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[(user_id, name, version)] = future
+        try:
+            value = await compute()
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            self._store(key, version, value)
+            return value
+        finally:
+            del self._inflight[(user_id, name, version)]
+
+    def _store(self, key: Tuple[str, str], version: int, value: Any) -> None:
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= previous[2]
+        self._entries[key] = (version, value, size)
+        self._size += size
+
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._size -= evicted_size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "coalesced": self.coalesced,
+            "entries": len(self._entries),
+            "bytes": self._size,
+        }
+
+
+analytics_cache = ResultCache(
+    settings.ANALYTICS_CACHE_MAX_ENTRIES,
+    settings.ANALYTICS_CACHE_MAX_BYTES,
+)
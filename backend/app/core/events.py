@@ -0,0 +1,73 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, Optional, Set
+from app.core.cache import bump_data_version
+from app.core.config import settings
+from app.core.search import search_index
+from app.core.store import run_store
+
+
+class ChangeHub:
+    """In-process fan-out of record change events to each user's connections.
+
+    Every connection gets a bounded queue. A connection that falls behind does
+    not slow down publishers or grow memory: its queue is cleared and replaced
+    by a single "resync" event telling the client to refetch.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.resyncs = 0
+        self._queues: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._queues[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue) -> None:
+        queues = self._queues.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._queues[user_id]
+
+    def publish(self, user_id: str, event: dict) -> None:
+        for queue in self._queues.get(user_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync", "collection": event.get("collection")})
+                self.resyncs += 1
+
+    @property
+    def connections(self) -> int:
+        return sum(len(queues) for queues in self._queues.values())
+
+
+hub = ChangeHub(settings.EVENTS_QUEUE_SIZE)
+
+
+async def publish_change(
+    user_id: str,
+    collection: str,
+    change: str,
+    record: Optional[dict] = None,
+) -> None:
+    """Record that a user's data changed and notify their open connections.
+
+    Every mutation goes through here, so this is also where the user's data
+    version is bumped to invalidate cached results and where the search
+    index is kept current. `change` is "upsert",
+    "delete" or "resync" (the whole collection should be refetched, e.g.
+    after a bulk import).
+    """
+    version = await run_store(bump_data_version, user_id)
+    search_index.apply_change(user_id, collection, change, record, version)
+    event = {"type": change, "collection": collection}
+    if record is not None:
+        event["record"] = record
+    hub.publish(user_id, event)
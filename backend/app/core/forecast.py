@@ -0,0 +1,114 @@
+import math
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from app.core.config import settings
+
+# Goal completion forecasts. A goal's progress history is reduced to daily
+# totals over the last FORECAST_HISTORY_DAYS days (or since the goal was
+# created, days without progress counting as zero). Their mean is the
+# expected daily rate, used to project the completion date; treating days as
+# independent, the total by the deadline is roughly normal with mean
+# rate * days and variance var * days, which gives the probability of
+# reaching the target in time.
+#
+# A batch of goals is computed as numpy arrays: every progress point of the
+# batch is binned into one goals x days matrix, and the rates, projections
+# and probabilities are whole-array operations. Pure functions over plain
+# records, so batches can run in job worker processes.
+
+# Projections further out than this are reported as "no completion date"
+MAX_PROJECTION_DAYS = 100 * 365
+
+_MICROSECONDS_PER_DAY = 86400 * 10**6
+
+
+def _naive_utc(value: str) -> datetime:
+    timestamp = datetime.fromisoformat(value)
+    if timestamp.tzinfo:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def _normal_cdf(x):
+    """Standard normal CDF of an array (Abramowitz-Stegun 7.1.26, error < 2e-7)"""
+    import numpy as np
+
+    z = np.abs(x) / math.sqrt(2)
+    t = 1 / (1 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-z * z)
+    return 0.5 * (1 + np.sign(x) * erf)
+
+
+def forecast_goals(rows: List[Tuple[dict, Optional[dict]]], now: str) -> List[dict]:
+    """Forecast a batch of (goal, progress series or None) pairs as of `now`"""
+    import numpy as np
+
+    timestamp = datetime.fromisoformat(now)
+    now64 = np.datetime64(timestamp, "us")
+    count = len(rows)
+    history = settings.FORECAST_HISTORY_DAYS
+    window_start = timestamp - timedelta(days=history)
+
+    starts = np.array(
+        [max(window_start, _naive_utc(goal["created_at"])) for goal, _ in rows],
+        dtype="datetime64[us]"
+    )
+    days = np.maximum(1, np.ceil((now64 - starts).astype(np.int64) / _MICROSECONDS_PER_DAY))
+    targets = np.array([goal["target_value"] for goal, _ in rows], dtype=float)
+    values = np.array([goal["current_value"] for goal, _ in rows], dtype=float)
+    deadlines = np.array(
+        [_naive_utc(goal["deadline"]) if goal.get("deadline") else None for goal, _ in rows],
+        dtype="datetime64[us]"
+    )
+
+    # Every progress point of the batch, binned by goal and day
+    counts, stamps, deltas = [], [], []
+    for _, series in rows:
+        points = series["daily"] + series["hourly"] + series["raw"] if series else []
+        counts.append(len(points))
+        stamps += [point["timestamp"] for point in points]
+        deltas += [point["delta"] for point in points]
+    owners = np.repeat(np.arange(count), counts)
+    offsets = (np.array(stamps, dtype="datetime64[us]") - starts[owners]).astype(np.int64) // _MICROSECONDS_PER_DAY
+    keep = (offsets >= 0) & (offsets < days[owners])
+    totals = np.zeros((count, history + 1))
+    np.add.at(totals, (owners[keep], offsets[keep]), np.array(deltas, dtype=float)[keep])
+
+    rate = totals.sum(axis=1) / days
+    variance = np.maximum(0.0, (totals * totals).sum(axis=1) / days - rate * rate)
+    remaining = targets - values
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        to_go = np.where(remaining <= 0, 0.0, remaining / rate)
+        projectable = (remaining <= 0) | ((rate > 0) & (to_go <= MAX_PROJECTION_DAYS))
+        projected = now64 + np.where(projectable, to_go * _MICROSECONDS_PER_DAY, 0).astype("timedelta64[us]")
+
+        has_deadline = ~np.isnat(deadlines)
+        days_left = np.where(
+            has_deadline, (deadlines - now64).astype(np.int64) / _MICROSECONDS_PER_DAY, 0.0
+        )
+        expected = rate * days_left
+        spread = np.sqrt(variance * np.maximum(days_left, 0.0))
+        probability = np.where(
+            spread > 0,
+            1 - _normal_cdf((remaining - expected) / spread),
+            (expected >= remaining).astype(float)
+        )
+    probability = np.where(days_left <= 0, 0.0, probability)
+    probability = np.where(remaining <= 0, 1.0, probability)
+
+    projected_text = np.datetime_as_string(projected, unit="us")
+    computed_at = timestamp.isoformat()
+    return [
+        {
+            "id": goal["id"],
+            "user_id": goal["user_id"],
+            "daily_rate": float(rate[index]),
+            "daily_rate_stddev": math.sqrt(variance[index]),
+            "projected_completion": str(projected_text[index]) if projectable[index] else None,
+            "deadline_probability": round(float(probability[index]), 4) if has_deadline[index] else None,
+            "computed_at": computed_at,
+        }
+        for index, (goal, _) in enumerate(rows)
+    ]
@@ -0,0 +1,87 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.jobs import job_runner
+from app.core.store import run_store
+
+
+class ForecastBatch:
+    """Nightly goal forecasts for all users, computed on the job process pool.
+
+    Goals are paged through FORECAST_CHUNK_SIZE at a time, so only one chunk
+    is held in memory: its progress series are read with one get_many, it is
+    forecast in a worker process and the results are written with one
+    put_many to the `forecasts` store, which GET /goals reads. Each night's
+    run is claimed in the `runs` store first, so with a shared store only one
+    web worker computes it.
+    """
+
+    def __init__(self, goals, progress, forecasts, runs):
+        self.goals = goals
+        self.progress = progress
+        self.forecasts = forecasts
+        self.runs = runs
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._schedule())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _schedule(self) -> None:
+        while True:
+            now = datetime.utcnow()
+            next_run = now.replace(hour=settings.FORECAST_RUN_HOUR, minute=0, second=0, microsecond=0)
+            if next_run <= now:
+                next_run += timedelta(days=1)
+            await asyncio.sleep((next_run - now).total_seconds())
+
+            if not await run_store(self._claim, next_run.date().isoformat()):
+                continue
+            try:
+                await self.run()
+            except Exception as e:
+                print(f"Goal forecast batch failed: {e}")
+
+    def _claim(self, run_date: str) -> bool:
+        key = f"goal_forecasts:{run_date}"
+
+        def mark_claimed(record: dict) -> None:
+            if record["runner_pid"] is None:
+                record["runner_pid"] = os.getpid()
+
+        run = self.runs.apply(key, mark_claimed, default={"id": key, "runner_pid": None})
+        return run["runner_pid"] == os.getpid()
+
+    async def run(self, now: Optional[datetime] = None) -> int:
+        """Forecast every goal as of `now` and return how many were processed"""
+        now = now or datetime.utcnow()
+        pages = self.goals.iter_pages(settings.FORECAST_CHUNK_SIZE)
+        processed = 0
+
+        while True:
+            # Each page is a separate read, so the iterator can move between threads
+            chunk = await run_in_threadpool(next, pages, None)
+            if chunk is None:
+                break
+            progress = await run_in_threadpool(
+                self.progress.get_many, [goal["id"] for goal in chunk]
+            )
+            rows = [(goal, progress.get(goal["id"], {}).get("series")) for goal in chunk]
+            forecasts = await job_runner.run("goal_forecasts", {"rows": rows, "now": now.isoformat()})
+            await run_in_threadpool(
+                self.forecasts.put_many, {forecast["id"]: forecast for forecast in forecasts}
+            )
+            processed += len(chunk)
+
+        return processed
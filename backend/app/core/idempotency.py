@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from app.core.config import settings
+from app.core.store import get_store, run_store
+
+# How often a waiting retry re-reads a key claimed by another worker, and how
+# often expired keys are deleted
+POLL_INTERVAL_SECONDS = 0.05
+PURGE_INTERVAL_SECONDS = 600
+
+
+def _fingerprint(payload: BaseModel) -> str:
+    # Keyed so that bodies carrying secrets (signup passwords) can't be
+    # brute-forced from a copy of the shared collection
+    body = json.dumps(payload.model_dump(mode="json"), sort_keys=True)
+    return hmac.new(settings.SECRET_KEY.encode(), body.encode(), hashlib.sha256).hexdigest()
+
+
+class IdempotencyCache:
+    """Replays responses for retried requests that carry an Idempotency-Key.
+
+    Keys are scoped (per user and endpoint) and kept for `ttl` seconds (or the
+    `ttl` passed to `run`, for responses that go stale sooner) in a shared
+    collection, so a retry routed to another worker is replayed too.
+    The first request claims its key atomically with `apply`; a retry that
+    arrives while it is still running waits for it (through an in-process
+    future on the same worker, by polling the record on another) instead of
+    executing again. A claim not completed within `lease` seconds, e.g. because
+    its worker died, can be taken over. Reusing a key with a different payload
+    is rejected.
+    """
+
+    def __init__(self, store, ttl: int, lease: int):
+        self.store = store
+        self.ttl = ttl
+        self.lease = lease
+        self.replays = 0
+        self._inflight: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self._next_purge = 0.0
+
+    def _claim(self, record_key: str, fingerprint: str, token: str, ttl: int) -> dict:
+        now = time.time()
+
+        def claim(record: dict) -> None:
+            expired = record.get("expires_at", 0) <= now
+            abandoned = record.get("status") == "running" and record["lease_expires_at"] <= now
+            if expired or abandoned:
+                record.update(
+                    fingerprint=fingerprint,
+                    status="running",
+                    token=token,
+                    response=None,
+                    expires_at=now + ttl,
+                    lease_expires_at=now + self.lease,
+                )
+
+        return self.store.apply(record_key, claim, default={"id": record_key, "user_id": None})
+
+    def _finish(self, record_key: str, token: str, response: Any = None, failed: bool = False) -> None:
+        def finish(record: dict) -> None:
+            if record.get("token") != token:
+                return
+            if failed:
+                # Failed requests aren't remembered: the next retry executes
+                record["expires_at"] = 0
+                record["status"] = "failed"
+            else:
+                record["status"] = "done"
+                record["response"] = jsonable_encoder(response)
+
+        self.store.apply(record_key, finish)
+
+    def purge_expired(self, now: float) -> int:
+        expired = [
+            record["id"] for record in self.store.values()
+            if record.get("expires_at", 0) <= now and record.get("status") != "running"
+        ]
+        for record_key in expired:
+            self.store.pop(record_key, None)
+        return len(expired)
+
+    async def run(
+        self,
+        scope: Hashable,
+        key: Optional[str],
+        payload: BaseModel,
+        handler: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+    ) -> Any:
+        if key is None:
+            return await handler()
+
+        record_key = hashlib.sha256(json.dumps([list(scope), key]).encode()).hexdigest()
+        fingerprint = _fingerprint(payload)
+        if ttl is None:
+            ttl = self.ttl
+
+        if time.monotonic() >= self._next_purge:
+            self._next_purge = time.monotonic() + PURGE_INTERVAL_SECONDS
+            await run_in_threadpool(self.purge_expired, time.time())
+
+        token = uuid.uuid4().hex
+        while True:
+            inflight = self._inflight.get(record_key)
+            if inflight is not None:
+                if inflight[0] != fingerprint:
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail="Idempotency-Key was already used with a different request"
+                    )
+                self.replays += 1
+                return await asyncio.shield(inflight[1])
+
+            record = await run_store(self._claim, record_key, fingerprint, token, ttl)
+            if record["token"] == token:
+                break
+            if record["fingerprint"] != fingerprint:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Idempotency-Key was already used with a different request"
+                )
+            if record["status"] == "done":
+                self.replays += 1
+                return record["response"]
+            # Running on another worker
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[record_key] = (fingerprint, future)
+        try:
+            response = await handler()
+        except BaseException as e:
+            # Retries waiting in this process see the error
+            future.set_exception(e)
+            future.exception()
+            await run_store(self._finish, record_key, token, failed=True)
+            raise
+        else:
+            future.set_result(response)
+            await run_store(self._finish, record_key, token, response)
+            return response
+        finally:
+            del self._inflight[record_key]
+
+
+idempotent_requests = IdempotencyCache(
+    get_store("idempotency_keys"),
+    settings.IDEMPOTENCY_TTL_SECONDS,
+    settings.IDEMPOTENCY_LEASE_SECONDS,
+)
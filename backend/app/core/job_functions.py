@@ -0,0 +1,19 @@
+from typing import Any, Callable, Dict
+from app.core.analytics import summarize_tasks, summarize_user
+from app.core.forecast import forecast_goals
+
+# Job kinds and the functions that run them in a worker process (looked up
+# there by kind through `run_job`). Each takes the job's args dict and returns
+# a JSON-serializable result. Worker processes import this module, so it must
+# not import anything that opens stores. Kinds users may queue are listed in
+# JobKind; the rest are run internally through `JobRunner.run`.
+JOB_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "user_analytics": lambda args: summarize_user(args["tasks"], args.get("goals", [])),
+    "task_analytics": lambda args: summarize_tasks(args["tasks"]),
+    "goal_forecasts": lambda args: forecast_goals(args["rows"], args["now"]),
+}
+
+
+def run_job(kind: str, args: Dict[str, Any]) -> Any:
+    """Entry point executed in the worker process"""
+    return JOB_FUNCTIONS[kind](args)
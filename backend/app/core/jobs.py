@@ -0,0 +1,225 @@
+import asyncio
+import heapq
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.job_functions import run_job
+from app.core.store import get_store, run_store
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+# How often finished jobs older than JOBS_RETENTION_SECONDS are deleted
+SWEEP_INTERVAL_SECONDS = 3600
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _requeue(record: dict) -> None:
+    record["status"] = "queued"
+    record["runner_pid"] = None
+
+
+class JobRunner:
+    """Persistent priority queue of CPU-bound jobs run on a process pool.
+
+    Jobs are records in the `jobs` collection, so queued work survives a
+    restart when the store is persistent. Each web worker keeps an in-memory
+    heap of the jobs it knows about (those submitted to it, plus every queued
+    job found at startup) and claims a job atomically before running it, so
+    several web workers never run the same job twice.
+    """
+
+    def __init__(self, store, workers: int):
+        self.store = store
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._heap: List[Tuple[int, int, str]] = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._sweeper: Optional[asyncio.Task] = None
+        self._running: Dict[str, asyncio.Task] = {}
+        self._stopping = False
+
+    def _push(self, job: dict) -> None:
+        heapq.heappush(self._heap, (PRIORITIES[job["priority"]], next(self._sequence), job["id"]))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        self._stopping = False
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._wakeup = asyncio.Event()
+
+        # Requeue jobs whose worker died mid-run, then pick up queued ones
+        for job in sorted(await run_store(self.store.values), key=lambda job: job["created_at"]):
+            if job["status"] == "running" and not _pid_alive(job.get("runner_pid")):
+                job = await run_store(self.store.apply, job["id"], _requeue)
+            if job["status"] == "queued":
+                self._push(job)
+
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        self._sweeper = asyncio.create_task(self._sweep())
+
+    async def submit(self, user_id: str, kind: str, priority: str, args: Dict[str, Any]) -> dict:
+        import uuid
+
+        if self._stopping:
+            raise RuntimeError("Job runner is shutting down")
+        job = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "kind": kind,
+            "priority": priority,
+            "status": "queued",
+            "args": args,
+            "result": None,
+            "error": None,
+            "runner_pid": None,
+            "created_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        await run_store(self.store.__setitem__, job["id"], job)
+        self._push(job)
+        return job
+
+    async def run(self, kind: str, args: Dict[str, Any]) -> Any:
+        """Run a job function on the pool and wait for it, without queueing or storing a job"""
+        if self._executor is None or self._stopping:
+            raise RuntimeError("Job runner is not running")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, run_job, kind, args)
+
+    async def cancel(self, job_id: str) -> dict:
+        """Cancel a queued job; raises ValueError if it already started"""
+        def mark_cancelled(record: dict) -> None:
+            if record["status"] != "queued":
+                raise ValueError(record["status"])
+            record["status"] = "cancelled"
+            record["finished_at"] = datetime.utcnow().isoformat()
+            record["args"] = None
+
+        # The heap entry is skipped when it comes up
+        return await run_store(self.store.apply, job_id, mark_cancelled)
+
+    def _claim(self, job_id: str) -> Optional[dict]:
+        def mark_running(record: dict) -> None:
+            if record["status"] == "queued":
+                record["status"] = "running"
+                record["runner_pid"] = os.getpid()
+                record["started_at"] = datetime.utcnow().isoformat()
+
+        try:
+            job = self.store.apply(job_id, mark_running)
+        except KeyError:
+            return None
+        if job["status"] != "running" or job["runner_pid"] != os.getpid():
+            return None
+        return job
+
+    async def _dispatch(self) -> None:
+        while not self._stopping:
+            if not self._heap or len(self._running) >= self.workers:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            _, _, job_id = heapq.heappop(self._heap)
+            job = await run_store(self._claim, job_id)
+            if job is None:
+                continue
+
+            self._running[job_id] = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: dict) -> None:
+        loop = asyncio.get_running_loop()
+        result = error = None
+        try:
+            result = await loop.run_in_executor(self._executor, run_job, job["kind"], job["args"])
+        except asyncio.CancelledError:
+            # Interrupted by shutdown: run it again on the next start
+            await run_store(self.store.apply, job["id"], _requeue)
+            return
+        except Exception as e:
+            error = e
+        finally:
+            del self._running[job["id"]]
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+        def complete(record: dict) -> None:
+            record["finished_at"] = datetime.utcnow().isoformat()
+            # The input is only needed to run the job
+            record["args"] = None
+            if error is None:
+                record["status"] = "succeeded"
+                record["result"] = result
+            else:
+                record["status"] = "failed"
+                record["error"] = str(error) or type(error).__name__
+
+        await run_store(self.store.apply, job["id"], complete)
+
+    def purge_finished(self, now: datetime) -> int:
+        """Delete jobs that finished more than JOBS_RETENTION_SECONDS ago"""
+        cutoff = (now - timedelta(seconds=settings.JOBS_RETENTION_SECONDS)).isoformat()
+        expired = [
+            job["id"] for job in self.store.values()
+            if job["status"] in FINISHED_STATUSES and job["finished_at"] < cutoff
+        ]
+        for job_id in expired:
+            self.store.pop(job_id, None)
+        return len(expired)
+
+    async def _sweep(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.purge_finished, datetime.utcnow())
+            except Exception as e:
+                print(f"Failed to purge finished jobs: {e}")
+            await asyncio.sleep(SWEEP_INTERVAL_SECONDS)
+
+    async def stop(self) -> None:
+        """Stop taking jobs, let running ones finish, then shut the pool down.
+
+        Jobs still running after JOBS_DRAIN_TIMEOUT_SECONDS are requeued.
+        """
+        self._stopping = True
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._dispatcher is not None:
+            await self._dispatcher
+
+        running = list(self._running.values())
+        if running:
+            await asyncio.wait(running, timeout=settings.JOBS_DRAIN_TIMEOUT_SECONDS)
+        leftover = list(self._running.values())
+        for task in leftover:
+            task.cancel()
+        # Let the cancelled jobs requeue themselves before returning
+        await asyncio.gather(*leftover, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+job_runner = JobRunner(get_store("jobs"), settings.JOBS_WORKERS or os.cpu_count() or 1)
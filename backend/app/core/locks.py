@@ -0,0 +1,55 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Hashable
+from app.core.config import settings
+
+
+class StripedLock:
+    """Fixed pool of asyncio locks shared by all keys.
+
+    A key always maps to the same stripe, so read-modify-write sections on
+    the same key never interleave, while unrelated keys only contend when
+    they happen to share a stripe. Hold one key at a time: nesting two keys
+    can deadlock when they land on the same stripe.
+
+    The locks coordinate coroutines within one process; writes from other
+    worker processes are made atomic by the store itself (see `apply`).
+    """
+
+    def __init__(self, stripes: int):
+        self._locks = [asyncio.Lock() for _ in range(stripes)]
+        self.acquisitions = 0
+        self.contended = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @asynccontextmanager
+    async def hold(self, *key: Hashable) -> AsyncIterator[None]:
+        lock = self._locks[hash(key) % len(self._locks)]
+        self.acquisitions += 1
+        if lock.locked():
+            self.contended += 1
+            started = time.perf_counter()
+            await lock.acquire()
+            waited = time.perf_counter() - started
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        else:
+            await lock.acquire()
+        try:
+            yield
+        finally:
+            lock.release()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "stripes": len(self._locks),
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+            "total_wait_seconds": round(self.total_wait, 6),
+            "max_wait_seconds": round(self.max_wait, 6),
+        }
+
+
+write_locks = StripedLock(settings.WRITE_LOCK_STRIPES)
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import fastapi
+import pydantic
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from app.core.config import settings
+
+# Source the document is generated from: routes, models and their docstrings
+SOURCE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _source_digest(directory: str) -> str:
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for filename in sorted(files):
+            if filename.endswith(".py"):
+                path = os.path.join(root, filename)
+                digest.update(os.path.relpath(path, directory).encode())
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _schema_fingerprint(app: FastAPI) -> str:
+    """Hash of everything the document depends on, used to detect a stale cache.
+
+    Covers the app metadata and routes, the source of the app package (so
+    any model change counts) and the FastAPI/pydantic versions.
+    """
+    parts = [
+        app.title,
+        app.version,
+        app.description,
+        fastapi.__version__,
+        pydantic.VERSION,
+        _source_digest(SOURCE_DIR),
+    ]
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            parts.append(f"{sorted(route.methods)} {route.path} {route.name}")
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def install_cached_openapi(app: FastAPI) -> None:
+    """Serve the OpenAPI document from OPENAPI_CACHE_PATH when it is up to date.
+
+    The first process to build the schema writes it to disk, so freshly
+    started workers load it instead of walking every route and model.
+    """
+    build_openapi = app.openapi
+
+    def openapi():
+        if app.openapi_schema:
+            return app.openapi_schema
+
+        path = settings.OPENAPI_CACHE_PATH
+        if not path:
+            return build_openapi()
+
+        fingerprint = _schema_fingerprint(app)
+        try:
+            with open(path) as f:
+                cached = json.load(f)
+            if cached.get("fingerprint") == fingerprint:
+                app.openapi_schema = cached["schema"]
+                return app.openapi_schema
+        except (OSError, ValueError, KeyError):
+            pass
+
+        schema = build_openapi()
+        try:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"fingerprint": fingerprint, "schema": schema}, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+        return schema
+
+    app.openapi = openapi
@@ -0,0 +1,102 @@
+from datetime import date as Date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Weekly and monthly rollups of per-day records (health, wellness). Each
+# bucket record keeps the day values it covers (at most 31) next to the
+# aggregates, so re-posting a day replaces its values and the bucket's
+# sum/mean/min/max/count are recomputed from the bucket alone. Reading a
+# range of rollups costs one record per bucket regardless of how many raw
+# days the user has.
+#
+# Days stored before rollups existed are folded in by `backfill_rollups` on
+# the user's first rollup read; a marker record remembers that it ran.
+
+PERIODS = ("week", "month")
+
+
+def bucket_for(day: Date, period: str) -> str:
+    if period == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    return f"{day.year}-{day.month:02d}"
+
+
+def _summarize(days: Dict[str, Dict[str, float]], metrics: Iterable[str]) -> Dict[str, dict]:
+    summary = {}
+    for metric in metrics:
+        values = [float(values[metric]) for values in days.values() if values.get(metric) is not None]
+        if not values:
+            continue
+        total = sum(values)
+        summary[metric] = {
+            "sum": total,
+            "mean": total / len(values),
+            "min": min(values),
+            "max": max(values),
+            "count": len(values),
+        }
+    return summary
+
+
+def update_rollups(store, user_id: str, records: Iterable[dict], metrics: List[str]) -> None:
+    """Fold daily records into their weekly and monthly buckets.
+
+    Records are grouped first, so each touched bucket is written once.
+    Records whose date isn't an ISO date can't be bucketed and are skipped.
+    """
+    buckets: Dict[Tuple[str, str], Dict[str, Dict[str, float]]] = {}
+    for record in records:
+        try:
+            day = Date.fromisoformat(record["date"])
+        except ValueError:
+            continue
+        values = {metric: record.get(metric) for metric in metrics}
+        for period in PERIODS:
+            buckets.setdefault((period, bucket_for(day, period)), {})[record["date"]] = values
+
+    for (period, bucket), days in buckets.items():
+        def merge(rollup: dict, days=days) -> None:
+            rollup["days"].update(days)
+            rollup["metrics"] = _summarize(rollup["days"], metrics)
+
+        key = f"{user_id}:{period}:{bucket}"
+        store.apply(
+            key,
+            merge,
+            default={
+                "id": key,
+                "user_id": user_id,
+                "period": period,
+                "bucket": bucket,
+                "days": {},
+                "metrics": {},
+            },
+        )
+
+
+def backfill_rollups(records, store, user_id: str, metrics: List[str]) -> None:
+    """Fold all of the user's day `records` into `store` once"""
+    marker = f"{user_id}:backfill"
+    if marker in store:
+        return
+    update_rollups(store, user_id, records.iter_user(user_id), metrics)
+    store[marker] = {"id": marker, "user_id": user_id, "period": "backfill", "bucket": ""}
+
+
+def get_rollups(
+    store,
+    user_id: str,
+    period: str,
+    start: Optional[Date] = None,
+    end: Optional[Date] = None,
+) -> List[dict]:
+    """Return the user's buckets for `period` overlapping [start, end], in order"""
+    first = bucket_for(start, period) if start else None
+    last = bucket_for(end, period) if end else None
+    rollups = [
+        rollup for rollup in store.iter_user(user_id)
+        if rollup["period"] == period
+        and (first is None or rollup["bucket"] >= first)
+        and (last is None or rollup["bucket"] <= last)
+    ]
+    return sorted(rollups, key=lambda rollup: rollup["bucket"])
@@ -0,0 +1,191 @@
+import bisect
+import heapq
+import math
+import re
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.store import run_store
+
+# In-process inverted index over task and goal titles/descriptions. The index
+# is partitioned per user; a partition is built from the stores on the user's
+# first search and then kept current by the change hook in app.core.events.
+#
+# Each partition remembers the data version it reflects. A change is applied
+# incrementally only when it is the very next version; otherwise (e.g. the
+# change was made by another worker) the partition is dropped and rebuilt on
+# the next search. Partitions are built in the threadpool and only swapped in
+# if no change was published while they were being built.
+
+INDEXED_COLLECTIONS = ("tasks", "goals")
+TITLE_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+PREFIX_MATCH_FACTOR = 0.5
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def _term_weights(record: dict) -> Dict[str, int]:
+    weights: Dict[str, int] = {}
+    for term in tokenize(record.get("title")):
+        weights[term] = weights.get(term, 0) + TITLE_WEIGHT
+    for term in tokenize(record.get("description")):
+        weights[term] = weights.get(term, 0) + DESCRIPTION_WEIGHT
+    return weights
+
+
+class _Partition:
+    def __init__(self, version: int):
+        self.version = version
+        # doc key -> (collection, record summary)
+        self.docs: Dict[str, Tuple[str, dict]] = {}
+        # doc key -> {term: weight}, kept to remove a document's postings
+        self.doc_terms: Dict[str, Dict[str, int]] = {}
+        # term -> {doc key: weight}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        # Sorted vocabulary for prefix lookups
+        self.terms: List[str] = []
+
+    def add(self, collection: str, record: dict) -> None:
+        key = f"{collection}:{record['id']}"
+        self.remove(key)
+        weights = _term_weights(record)
+        self.docs[key] = (collection, {
+            "id": record["id"],
+            "title": record.get("title"),
+            "description": record.get("description"),
+        })
+        self.doc_terms[key] = weights
+        for term, weight in weights.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                bisect.insort(self.terms, term)
+            postings[key] = weight
+
+    def remove(self, key: str) -> None:
+        weights = self.doc_terms.pop(key, None)
+        if weights is None:
+            return
+        del self.docs[key]
+        for term in weights:
+            postings = self.postings[term]
+            del postings[key]
+            if not postings:
+                del self.postings[term]
+                del self.terms[bisect.bisect_left(self.terms, term)]
+
+    def _matches(self, query_term: str) -> Iterable[Tuple[str, float]]:
+        """Yield (index term, factor) for exact and prefix matches"""
+        index = bisect.bisect_left(self.terms, query_term)
+        while index < len(self.terms) and self.terms[index].startswith(query_term):
+            term = self.terms[index]
+            yield term, 1.0 if term == query_term else PREFIX_MATCH_FACTOR
+            index += 1
+
+    def search(self, query: str, limit: int) -> List[Tuple[float, str]]:
+        query_terms = tokenize(query)
+        if not query_terms:
+            return []
+
+        total = len(self.docs)
+        scores: Optional[Dict[str, float]] = None
+        for query_term in query_terms:
+            term_scores: Dict[str, float] = {}
+            for term, factor in self._matches(query_term):
+                postings = self.postings[term]
+                idf = math.log(1 + total / len(postings))
+                for key, weight in postings.items():
+                    term_scores[key] = term_scores.get(key, 0.0) + factor * weight * idf
+            # Every query term has to match
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {key: score + term_scores[key] for key, score in scores.items() if key in term_scores}
+            if not scores:
+                return []
+
+        return heapq.nlargest(limit, ((score, key) for key, score in scores.items()))
+
+
+def _build_partition(version: int, load: Callable[[], Iterable[Tuple[str, dict]]]) -> _Partition:
+    partition = _Partition(version)
+    for collection, record in load():
+        partition.add(collection, record)
+    return partition
+
+
+class SearchIndex:
+    """Per-user inverted indexes, with at most `max_users` kept in memory"""
+
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        self._partitions: "OrderedDict[str, _Partition]" = OrderedDict()
+
+    def apply_change(
+        self,
+        user_id: str,
+        collection: str,
+        change: str,
+        record: Optional[dict],
+        version: int,
+    ) -> None:
+        """Apply a record change made at `version` to the user's partition"""
+        partition = self._partitions.get(user_id)
+        if partition is None:
+            return
+        if version != partition.version + 1:
+            del self._partitions[user_id]
+            return
+
+        partition.version = version
+        if collection not in INDEXED_COLLECTIONS:
+            return
+        if change == "upsert" and record is not None:
+            partition.add(collection, record)
+        elif change == "delete" and record is not None:
+            partition.remove(f"{collection}:{record['id']}")
+        elif change == "resync":
+            del self._partitions[user_id]
+
+    async def search(
+        self,
+        user_id: str,
+        query: str,
+        limit: int,
+        get_version: Callable[[], int],
+        load: Callable[[], Iterable[Tuple[str, dict]]],
+    ) -> List[dict]:
+        """Return the best matches as dicts with collection, score and record fields.
+
+        `get_version` returns the user's current data version. `load` yields
+        (collection, record) pairs and is only called, in the threadpool, when
+        the user's partition is missing or older than that version.
+        """
+        version = await run_store(get_version)
+        partition = self._partitions.get(user_id)
+        if partition is None or partition.version != version:
+            partition = await run_in_threadpool(_build_partition, version, load)
+            # A change published during the build may be missing from it: use
+            # it for this query only and rebuild on the next one
+            if await run_store(get_version) == version:
+                self._partitions[user_id] = partition
+                self._partitions.move_to_end(user_id)
+                while len(self._partitions) > self.max_users:
+                    self._partitions.popitem(last=False)
+        else:
+            self._partitions.move_to_end(user_id)
+
+        results = []
+        for score, key in partition.search(query, limit):
+            collection, summary = partition.docs[key]
+            results.append({"collection": collection, "score": round(score, 4), **summary})
+        return results
+
+
+search_index = SearchIndex(settings.SEARCH_MAX_USERS)
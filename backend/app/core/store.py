@@ -0,0 +1,549 @@
+import atexit
+import copy
+import fcntl
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from collections.abc import MutableMapping
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+
+# Record collections used by the endpoint modules. Every collection maps a key
+# (record id, or email for users) to a JSON-serializable dict and behaves like
+# a regular dict, plus `for_user`/`iter_user` to read a single user's records,
+# `iter_pages` to walk the whole collection a page at a time,
+# `get_many`/`put_many` to read or write a batch of records at once, and
+# `apply` to change a record atomically (read-modify-write in one step, even
+# across workers).
+#
+# Values handed out are not live views: after changing a record, assign it
+# back (`store[key] = record`) so the change reaches the shared backend or
+# the durability log.
+#
+# Async code reaches the stores through `run_store`, so that SQLite calls
+# (which can wait up to the busy timeout for another worker's write) don't
+# block the event loop.
+
+T = TypeVar("T")
+
+
+class MemoryStore(MutableMapping):
+    """Collection held in a plain dict, private to the current process"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._data: Dict[str, dict] = {}
+
+    def __getitem__(self, key: str) -> dict:
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: dict) -> None:
+        self._data[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def values(self) -> List[dict]:
+        # A copy, taken in one step: readers run in threadpool threads while
+        # the event loop keeps writing to the dict
+        return list(self._data.values())
+
+    def for_user(self, user_id: str) -> List[dict]:
+        return [value for value in self.values() if value.get("user_id") == user_id]
+
+    def iter_user(self, user_id: str) -> Iterator[dict]:
+        return iter(self.for_user(user_id))
+
+    def iter_pages(self, page_size: int = 1000) -> Iterator[List[dict]]:
+        """Yield every record, `page_size` at a time (records deleted meanwhile are skipped)"""
+        # Only the keys are copied up front; records are read page by page
+        keys = list(self._data)
+        for start in range(0, len(keys), page_size):
+            page = self.get_many(keys[start:start + page_size])
+            if page:
+                yield list(page.values())
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, dict]:
+        """Return the records found under `keys`"""
+        data = self._data
+        return {key: data[key] for key in keys if key in data}
+
+    def put_many(self, items: Dict[str, dict]) -> None:
+        for key, value in items.items():
+            self[key] = value
+
+    def apply(
+        self,
+        key: str,
+        change: Callable[[dict], None],
+        default: Optional[dict] = None,
+    ) -> dict:
+        """Atomically apply `change` to the record under `key` and store it.
+
+        A missing record starts as a copy of `default`, or raises KeyError
+        when no default is given.
+        """
+        value = self._data.get(key)
+        if value is None:
+            if default is None:
+                raise KeyError(key)
+            value = copy.deepcopy(default)
+        change(value)
+        self[key] = value
+        return value
+
+
+# Log and snapshot records: op, payload length, crc32 of the payload
+_PUT, _DELETE = 1, 2
+_RECORD_HEADER = struct.Struct("<BII")
+_SNAPSHOT_MAGIC = b"CSSNAP01"
+# Snapshot header: magic, first log generation not covered by the snapshot
+_SNAPSHOT_HEADER = struct.Struct("<8sQ")
+
+
+def _encode_record(op: int, payload: bytes) -> bytes:
+    return _RECORD_HEADER.pack(op, len(payload), zlib.crc32(payload)) + payload
+
+
+def _decode_records(buf, offset: int = 0) -> Iterator[tuple]:
+    """Yield (op, payload) pairs, stopping at a torn or corrupt tail"""
+    end = len(buf)
+    while offset + _RECORD_HEADER.size <= end:
+        op, length, crc = _RECORD_HEADER.unpack_from(buf, offset)
+        start = offset + _RECORD_HEADER.size
+        if start + length > end:
+            break
+        payload = bytes(buf[start:start + length])
+        if zlib.crc32(payload) != crc:
+            break
+        yield op, payload
+        offset = start + length
+
+
+def _encode_put(key: str, value: dict) -> bytes:
+    return json.dumps([key, value], separators=(",", ":")).encode()
+
+
+def _fsync_directory(directory: str) -> None:
+    """Make created, renamed and deleted directory entries durable"""
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class LoggedMemoryStore(MemoryStore):
+    """In-memory collection made durable by an append-only log and snapshots.
+
+    Every mutation is appended to `<dir>/<name>.<generation>.log` and handed
+    to the OS before the write returns, so it survives the process being
+    killed. The background flusher fsyncs all pending appends together every
+    STORE_FSYNC_INTERVAL_MS, which bounds what a power loss can take. A
+    snapshot is written periodically, or as soon as the log outgrows
+    STORE_LOG_COMPACT_BYTES, and the log generations it covers are deleted.
+    On startup the snapshot is memory-mapped and the newer logs are replayed
+    on top of it.
+
+    A collection is locked (flock on `<name>.lock`) by the process that opens
+    it, so two workers can't append to the same logs.
+    """
+
+    def __init__(self, name: str, directory: str):
+        super().__init__(name)
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._log_bytes = 0
+        self._last_snapshot = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(os.path.join(directory, f"{name}.lock"), "a")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            raise RuntimeError(f"Store {name} in {directory} is open in another process")
+        self._generation = self._recover()
+        self._log = open(self._log_path(self._generation), "ab")
+        _fsync_directory(directory)
+        _register_logged_store(self)
+
+    def _log_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"{self.name}.{generation:08d}.log")
+
+    def _snapshot_path(self) -> str:
+        return os.path.join(self.directory, f"{self.name}.snap")
+
+    def _log_generations(self) -> List[int]:
+        prefix = f"{self.name}."
+        generations = []
+        for filename in os.listdir(self.directory):
+            middle = filename[len(prefix):-len(".log")]
+            if filename.startswith(prefix) and filename.endswith(".log") and middle.isdigit():
+                generations.append(int(middle))
+        return sorted(generations)
+
+    def _apply(self, buf, offset: int = 0) -> None:
+        for op, payload in _decode_records(buf, offset):
+            if op == _PUT:
+                key, value = json.loads(payload)
+                self._data[key] = value
+            elif op == _DELETE:
+                self._data.pop(payload.decode(), None)
+
+    def _recover(self) -> int:
+        """Load the snapshot and replay newer logs; return the next log generation"""
+        first = 0
+        path = self._snapshot_path()
+        # Left behind by a crash while writing a snapshot
+        if os.path.exists(f"{path}.tmp"):
+            os.remove(f"{path}.tmp")
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                if len(buf) < _SNAPSHOT_HEADER.size:
+                    raise RuntimeError(f"Corrupt snapshot: {path}")
+                magic, first = _SNAPSHOT_HEADER.unpack_from(buf)
+                if magic != _SNAPSHOT_MAGIC:
+                    raise RuntimeError(f"Corrupt snapshot: {path}")
+                self._apply(buf, _SNAPSHOT_HEADER.size)
+
+        last = first - 1
+        for generation in self._log_generations():
+            if generation < first:
+                os.remove(self._log_path(generation))
+                continue
+            with open(self._log_path(generation), "rb") as f:
+                self._apply(f.read())
+            last = generation
+        return last + 1
+
+    def values(self) -> List[dict]:
+        with self._lock:
+            return list(self._data.values())
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, dict]:
+        with self._lock:
+            return super().get_many(keys)
+
+    def _append(self, op: int, payload: bytes) -> None:
+        record = _encode_record(op, payload)
+        self._log.write(record)
+        self._log.flush()
+        self._log_bytes += len(record)
+        self._dirty = True
+
+    def __setitem__(self, key: str, value: dict) -> None:
+        with self._lock:
+            self._append(_PUT, _encode_put(key, value))
+            self._data[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            if key not in self._data:
+                raise KeyError(key)
+            self._append(_DELETE, key.encode())
+            del self._data[key]
+
+    def apply(
+        self,
+        key: str,
+        change: Callable[[dict], None],
+        default: Optional[dict] = None,
+    ) -> dict:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                if default is None:
+                    raise KeyError(key)
+                value = copy.deepcopy(default)
+            change(value)
+            self._append(_PUT, _encode_put(key, value))
+            self._data[key] = value
+        return value
+
+    def flush(self) -> None:
+        """Fsync every mutation appended since the last flush"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            fd = self._log.fileno()
+        # Outside the lock so writers keep appending while the disk syncs
+        os.fsync(fd)
+
+    def close(self) -> None:
+        """Flush the log and release the collection for other processes"""
+        if self in _logged_stores:
+            _logged_stores.remove(self)
+        with self._lock:
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._log.close()
+            self._dirty = False
+        self._lock_file.close()
+
+    def needs_snapshot(self) -> bool:
+        if self._log_bytes >= settings.STORE_LOG_COMPACT_BYTES:
+            return True
+        elapsed = time.monotonic() - self._last_snapshot
+        return self._log_bytes > 0 and elapsed >= settings.STORE_SNAPSHOT_INTERVAL_SECONDS
+
+    def snapshot(self) -> None:
+        """Write a snapshot of the current records and delete the logs it covers"""
+        with self._lock:
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._log.close()
+            self._generation += 1
+            self._log = open(self._log_path(self._generation), "ab")
+            self._dirty = False
+            self._log_bytes = 0
+            first = self._generation
+            records = list(self._data.items())
+
+        path = self._snapshot_path()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, first))
+            for key, value in records:
+                f.write(_encode_record(_PUT, _encode_put(key, value)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        # The new snapshot and log must be on disk before the logs they
+        # replace are deleted
+        _fsync_directory(self.directory)
+
+        for generation in self._log_generations():
+            if generation < first:
+                os.remove(self._log_path(generation))
+        self._last_snapshot = time.monotonic()
+
+
+_logged_stores: List[LoggedMemoryStore] = []
+_flusher: Optional[threading.Thread] = None
+
+
+def _run_flusher() -> None:
+    while True:
+        time.sleep(settings.STORE_FSYNC_INTERVAL_MS / 1000)
+        for store in list(_logged_stores):
+            try:
+                store.flush()
+                if store.needs_snapshot():
+                    store.snapshot()
+            except OSError as e:
+                print(f"Failed to persist store {store.name}: {e}")
+
+
+def _flush_logged_stores() -> None:
+    for store in _logged_stores:
+        store.flush()
+
+
+def _register_logged_store(store: LoggedMemoryStore) -> None:
+    global _flusher
+    _logged_stores.append(store)
+    if _flusher is None:
+        _flusher = threading.Thread(target=_run_flusher, name="store-flusher", daemon=True)
+        _flusher.start()
+        atexit.register(_flush_logged_stores)
+
+
+_local = threading.local()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    """Return this thread's connection to `path`, reopening it after a fork"""
+    connections = getattr(_local, "connections", None)
+    if connections is None or _local.pid != os.getpid():
+        connections = _local.connections = {}
+        _local.pid = os.getpid()
+
+    conn = connections.get(path)
+    if conn is None:
+        # Autocommit: each statement is its own transaction, so a write is
+        # visible to every other worker as soon as it returns
+        conn = sqlite3.connect(path, isolation_level=None, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        connections[path] = conn
+    return conn
+
+
+class SQLiteStore(MutableMapping):
+    """Collection stored in a SQLite table shared by all worker processes"""
+
+    def __init__(self, name: str, path: str):
+        self.name = name
+        self.path = path
+        conn = _connect(path)
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} "
+            "(key TEXT PRIMARY KEY, user_id TEXT, value TEXT NOT NULL)"
+        )
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name}_user_key ON {name} (user_id, key)")
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        return _connect(self.path).execute(sql, params)
+
+    def __getitem__(self, key: str) -> dict:
+        row = self._execute(f"SELECT value FROM {self.name} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return json.loads(row[0])
+
+    def __setitem__(self, key: str, value: dict) -> None:
+        self._execute(
+            f"INSERT OR REPLACE INTO {self.name} (key, user_id, value) VALUES (?, ?, ?)",
+            (key, value.get("user_id"), json.dumps(value)),
+        )
+
+    def __delitem__(self, key: str) -> None:
+        cursor = self._execute(f"DELETE FROM {self.name} WHERE key = ?", (key,))
+        if cursor.rowcount == 0:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        row = self._execute(f"SELECT 1 FROM {self.name} WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    def __iter__(self) -> Iterator[str]:
+        rows = self._execute(f"SELECT key FROM {self.name}").fetchall()
+        return iter([row[0] for row in rows])
+
+    def __len__(self) -> int:
+        return self._execute(f"SELECT COUNT(*) FROM {self.name}").fetchone()[0]
+
+    def values(self) -> List[dict]:
+        rows = self._execute(f"SELECT value FROM {self.name}").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def for_user(self, user_id: str) -> List[dict]:
+        rows = self._execute(
+            f"SELECT value FROM {self.name} WHERE user_id = ?", (user_id,)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def iter_user(self, user_id: str, page_size: int = 1000) -> Iterator[dict]:
+        """Yield a user's records page by page without loading them all at once"""
+        # Each page is a separate query, so the iterator can be resumed from
+        # another thread (as streaming responses do)
+        last_key = ""
+        while True:
+            rows = self._execute(
+                f"SELECT key, value FROM {self.name} WHERE user_id = ? AND key > ? "
+                "ORDER BY key LIMIT ?",
+                (user_id, last_key, page_size),
+            ).fetchall()
+            for row in rows:
+                yield json.loads(row[1])
+            if len(rows) < page_size:
+                return
+            last_key = rows[-1][0]
+
+    def iter_pages(self, page_size: int = 1000) -> Iterator[List[dict]]:
+        """Yield every record in key order, `page_size` at a time"""
+        # One query per page, like iter_user
+        last_key = ""
+        while True:
+            rows = self._execute(
+                f"SELECT key, value FROM {self.name} WHERE key > ? ORDER BY key LIMIT ?",
+                (last_key, page_size),
+            ).fetchall()
+            if rows:
+                yield [json.loads(row[1]) for row in rows]
+            if len(rows) < page_size:
+                return
+            last_key = rows[-1][0]
+
+    def get_many(self, keys: Iterable[str], batch_size: int = 500) -> Dict[str, dict]:
+        """Return the records found under `keys`, one query per `batch_size` keys"""
+        keys = list(keys)
+        found = {}
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            rows = self._execute(
+                f"SELECT key, value FROM {self.name} WHERE key IN ({', '.join('?' * len(batch))})",
+                tuple(batch),
+            ).fetchall()
+            for key, value in rows:
+                found[key] = json.loads(value)
+        return found
+
+    def put_many(self, items: Dict[str, dict]) -> None:
+        """Write a batch of records in a single transaction"""
+        conn = _connect(self.path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {self.name} (key, user_id, value) VALUES (?, ?, ?)",
+                [(key, value.get("user_id"), json.dumps(value)) for key, value in items.items()],
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def apply(
+        self,
+        key: str,
+        change: Callable[[dict], None],
+        default: Optional[dict] = None,
+    ) -> dict:
+        """Read, change and write a record inside one write transaction"""
+        conn = _connect(self.path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                f"SELECT value FROM {self.name} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                if default is None:
+                    raise KeyError(key)
+                value = copy.deepcopy(default)
+            else:
+                value = json.loads(row[0])
+            change(value)
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.name} (key, user_id, value) VALUES (?, ?, ?)",
+                (key, value.get("user_id"), json.dumps(value)),
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return value
+
+
+async def run_store(function: Callable[..., T], *args, **kwargs) -> T:
+    """Call `function` (which reads or writes stores) without blocking the event loop.
+
+    With the shared SQLite store it runs in the threadpool. The in-process
+    stores answer from memory, so their calls stay on the event loop, where
+    `apply` is atomic.
+    """
+    if settings.SHARED_STORE_PATH:
+        return await run_in_threadpool(function, *args, **kwargs)
+    return function(*args, **kwargs)
+
+
+def get_store(name: str) -> MutableMapping:
+    """Open the named collection using the configured backend"""
+    if settings.SHARED_STORE_PATH:
+        return SQLiteStore(name, settings.SHARED_STORE_PATH)
+    if settings.STORE_LOG_DIR:
+        return LoggedMemoryStore(name, settings.STORE_LOG_DIR)
+    return MemoryStore(name)
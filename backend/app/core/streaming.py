@@ -0,0 +1,37 @@
+import json
+from typing import Iterable, Iterator, Type
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from app.core.config import settings
+
+
+def _encode_envelope(records: Iterable[dict], model: Type[BaseModel], message: str) -> Iterator[str]:
+    yield '{"data":['
+    separator = ""
+    chunk = []
+    for record in records:
+        chunk.append(model(**record).model_dump_json())
+        if len(chunk) >= settings.STREAM_CHUNK_RECORDS:
+            yield separator + ",".join(chunk)
+            separator = ","
+            chunk = []
+    if chunk:
+        yield separator + ",".join(chunk)
+    yield f'],"message":{json.dumps(message)},"success":true}}'
+
+
+def stream_api_response(
+    records: Iterable[dict],
+    model: Type[BaseModel],
+    message: str,
+) -> StreamingResponse:
+    """Stream records inside the usual ApiResponse envelope.
+
+    Records are validated and encoded STREAM_CHUNK_RECORDS at a time, so the
+    first bytes go out before the whole list is built and memory stays
+    bounded by the chunk size.
+    """
+    return StreamingResponse(
+        _encode_envelope(records, model, message),
+        media_type="application/json",
+    )
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from app.core.config import settings
+
+# Bounded progress history. A series keeps recent increments as raw points
+# and folds older ones into hourly, then daily, buckets:
+#
+#   {"raw": [...], "hourly": [...], "daily": [...]}
+#
+# Every point/bucket is {"timestamp", "delta", "value", "count"}: the start of
+# the bucket (or the time of a raw point), the summed deltas, the value at the
+# end of the bucket and the number of increments folded into it. Each list is
+# kept in chronological order.
+
+
+def new_series() -> dict:
+    return {"raw": [], "hourly": [], "daily": []}
+
+
+def _fold(points: List[dict], buckets: List[dict], cutoff: datetime, floor) -> None:
+    """Move points older than `cutoff` from `points` into `buckets`"""
+    moved = 0
+    for point in points:
+        timestamp = datetime.fromisoformat(point["timestamp"])
+        if timestamp >= cutoff:
+            break
+        start = floor(timestamp).isoformat()
+        if buckets and buckets[-1]["timestamp"] == start:
+            bucket = buckets[-1]
+            bucket["delta"] += point["delta"]
+            bucket["value"] = point["value"]
+            bucket["count"] += point["count"]
+        else:
+            buckets.append({**point, "timestamp": start})
+        moved += 1
+    del points[:moved]
+
+
+def downsample(series: dict, now: datetime) -> None:
+    """Fold raw points into hourly buckets and hourly buckets into daily ones"""
+    _fold(
+        series["raw"],
+        series["hourly"],
+        now - timedelta(hours=settings.GOAL_PROGRESS_RAW_HOURS),
+        lambda t: t.replace(minute=0, second=0, microsecond=0),
+    )
+    _fold(
+        series["hourly"],
+        series["daily"],
+        now - timedelta(days=settings.GOAL_PROGRESS_HOURLY_DAYS),
+        lambda t: t.replace(hour=0, minute=0, second=0, microsecond=0),
+    )
+
+
+def add_point(series: dict, timestamp: datetime, delta: float, value: float) -> None:
+    """Record one increment and downsample whatever has aged out.
+
+    Increments recorded by other workers can arrive slightly out of order, so
+    the point is inserted at its place in time rather than appended.
+    """
+    raw = series["raw"]
+    index = len(raw)
+    while index and datetime.fromisoformat(raw[index - 1]["timestamp"]) > timestamp:
+        index -= 1
+    raw.insert(index, {
+        "timestamp": timestamp.isoformat(),
+        "delta": delta,
+        "value": value,
+        "count": 1,
+    })
+    downsample(series, max(timestamp, datetime.fromisoformat(raw[-1]["timestamp"])))
+
+
+def series_points(series: dict, since: Optional[datetime] = None) -> List[dict]:
+    """Return the whole series in chronological order, tagged by resolution"""
+    points = []
+    for resolution in ("daily", "hourly", "raw"):
+        for point in series[resolution]:
+            if since and datetime.fromisoformat(point["timestamp"]) < since:
+                continue
+            points.append({**point, "resolution": resolution})
+    return points
@@ -22,4 +22,4 @@ class UserResponse(BaseModel):
 
 class TokenResponse(BaseModel):
     user: UserResponse
-    token: str
\ No newline at end of file
+    token: str
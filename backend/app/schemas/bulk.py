@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import List
+from enum import Enum
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class BulkImportResponse(BaseModel):
+    created: int
+    updated: int
+    skipped: int
+    errors: List[str]
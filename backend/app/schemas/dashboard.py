@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from enum import Enum
+from app.schemas.task import TaskResponse
+from app.schemas.goal import GoalResponse
+from app.schemas.wellness import WellnessDataResponse
+from app.schemas.health import HealthDataResponse
+
+
+class DashboardSection(str, Enum):
+    tasks = "tasks"
+    goals = "goals"
+    wellness = "wellness"
+    health = "health"
+    analytics = "analytics"
+
+
+class DashboardResponse(BaseModel):
+    date: str
+    tasks: Optional[List[TaskResponse]] = None
+    goals: Optional[List[GoalResponse]] = None
+    wellness: Optional[List[WellnessDataResponse]] = None
+    health: Optional[List[HealthDataResponse]] = None
+    analytics: Optional[Dict[str, Any]] = None
@@ -20,6 +20,14 @@ class GoalUpdate(BaseModel):
     deadline: Optional[datetime] = None
 
 
+class GoalForecast(BaseModel):
+    daily_rate: float
+    daily_rate_stddev: float
+    projected_completion: Optional[str]
+    deadline_probability: Optional[float]
+    computed_at: str
+
+
 class GoalResponse(BaseModel):
     id: str
     title: str
@@ -30,4 +38,17 @@ class GoalResponse(BaseModel):
     deadline: Optional[str]
     user_id: str
     created_at: str
-    updated_at: str
\ No newline at end of file
+    updated_at: str
+    forecast: Optional[GoalForecast] = None
+
+
+class GoalProgressCreate(BaseModel):
+    delta: float
+
+
+class GoalProgressPoint(BaseModel):
+    timestamp: str
+    delta: float
+    value: float
+    count: int
+    resolution: str
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import Any, Optional
+from enum import Enum
+
+
+class JobKind(str, Enum):
+    user_analytics = "user_analytics"
+    task_analytics = "task_analytics"
+
+
+class JobPriority(str, Enum):
+    high = "high"
+    normal = "normal"
+    low = "low"
+
+
+class JobCreate(BaseModel):
+    kind: JobKind
+    priority: JobPriority = JobPriority.normal
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: JobKind
+    priority: JobPriority
+    status: str
+    result: Optional[Any]
+    error: Optional[str]
+    user_id: str
+    created_at: str
+    started_at: Optional[str]
+    finished_at: Optional[str]
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Dict
+from enum import Enum
+
+
+class RollupPeriod(str, Enum):
+    week = "week"
+    month = "month"
+
+
+class MetricSummary(BaseModel):
+    sum: float
+    mean: float
+    min: float
+    max: float
+    count: int
+
+
+class RollupResponse(BaseModel):
+    period: RollupPeriod
+    bucket: str
+    metrics: Dict[str, MetricSummary]
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class SearchResult(BaseModel):
+    collection: str
+    id: str
+    title: str
+    description: Optional[str]
+    score: float
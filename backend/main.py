@@ -1,9 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-import uvicorn
 
 from app.core.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.jobs import job_runner
+from app.core.openapi import install_cached_openapi
+from app.api.v1.endpoints.goals import goal_forecasts
 from app.api.v1.api import api_router
 
 
@@ -11,9 +14,13 @@ from app.api.v1.api import api_router
 async def lifespan(app: FastAPI):
     # Startup
     print("Starting up AI Scheduler API...")
+    await job_runner.start()
+    await goal_forecasts.start()
     yield
     # Shutdown
     print("Shutting down AI Scheduler API...")
+    await goal_forecasts.stop()
+    await job_runner.stop()
 
 
 def create_application() -> FastAPI:
@@ -34,9 +41,19 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Compress responses (brotli or gzip, negotiated per request)
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.GZIP_COMPRESSION_LEVEL,
+        brotli_quality=settings.BROTLI_QUALITY,
+    )
+
     # Include API router
     app.include_router(api_router, prefix=settings.API_V1_STR)
 
+    install_cached_openapi(app)
+
     return app
 
 
@@ -44,6 +61,8 @@ app = create_application()
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
@@ -0,0 +1,102 @@
+"""Time-to-first-request of freshly started worker processes.
+
+Starts `uvicorn main:app` in a new process, times how long it takes to answer
+its first request and then its first /openapi.json, and reports the median of
+several runs:
+
+    python scripts/startup_time.py --runs 10
+    python scripts/startup_time.py --openapi-cache /tmp/openapi.json
+
+With --openapi-cache, the cache file is written by a warm-up run first, so the
+timed runs measure workers that find an up-to-date document on disk.
+"""
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Answered without a token or a password check (unknown email -> 401)
+FIRST_REQUEST = ("POST", "/api/v1/auth/login", '{"email": "nobody@example.com", "password": "x"}')
+OPENAPI_REQUEST = ("GET", "/api/v1/openapi.json", None)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _request(port: int, method: str, path: str, body) -> int:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        headers = {"Content-Type": "application/json"} if body else {}
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
+
+
+def measure(app_dir: str, env: dict) -> tuple:
+    """Seconds from process start to the first response, then to /openapi.json"""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=app_dir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with {process.returncode}")
+            try:
+                _request(port, *FIRST_REQUEST)
+                break
+            except OSError:
+                time.sleep(0.005)
+        first_request = time.perf_counter() - started
+
+        openapi_started = time.perf_counter()
+        status = _request(port, *OPENAPI_REQUEST)
+        if status != 200:
+            raise RuntimeError(f"openapi.json returned {status}")
+        return first_request, time.perf_counter() - openapi_started
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--app-dir", default=BACKEND_DIR, help="directory containing main.py")
+    parser.add_argument("--openapi-cache", default="", help="OPENAPI_CACHE_PATH for the workers")
+    args = parser.parse_args()
+
+    env = dict(os.environ, OPENAPI_CACHE_PATH=args.openapi_cache, JOBS_WORKERS="1")
+    # Keep records in memory: nothing under test should touch a shared store
+    env.pop("SHARED_STORE_PATH", None)
+    env.pop("STORE_LOG_DIR", None)
+    # Warm-up: compiles bytecode and, with a cache path, writes the document
+    measure(args.app_dir, env)
+    results = [measure(args.app_dir, env) for _ in range(args.runs)]
+
+    first_requests, openapi = zip(*results)
+    print(f"first request  median {statistics.median(first_requests) * 1000:7.1f} ms"
+          f"  (min {min(first_requests) * 1000:.1f})")
+    print(f"openapi.json   median {statistics.median(openapi) * 1000:7.1f} ms"
+          f"  (min {min(openapi) * 1000:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import json
+import uuid
+
+import pytest
+
+from app.core.bulk import daily_record_key, get_daily_record, import_daily_records
+from app.core.config import settings
+from app.core.store import MemoryStore, SQLiteStore
+from app.schemas.health import HealthDataCreate
+
+
+class UploadRequest:
+    def __init__(self, lines):
+        self.headers = {"content-type": "application/x-ndjson"}
+        self._body = "\n".join(lines).encode()
+
+    async def stream(self):
+        # Split mid-line to exercise line reassembly
+        for start in range(0, len(self._body), 100):
+            yield self._body[start:start + 100]
+
+
+def _day(date: str, minutes: int = 30) -> str:
+    return json.dumps({
+        "hydration_level": 1.5,
+        "calories_consumed": 2000,
+        "movement_minutes": minutes,
+        "workout_completed": False,
+        "stress_level": 3,
+        "date": date,
+    })
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+async def test_import_counts_and_migrates_per_chunk(kind, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_CHUNK_SIZE", 3)
+    name = f"health_{uuid.uuid4().hex}"
+    store = MemoryStore(name) if kind == "memory" else SQLiteStore(name, str(tmp_path / "s.db"))
+    store[daily_record_key("u1", "2026-01-01")] = {
+        "id": daily_record_key("u1", "2026-01-01"), "user_id": "u1", "date": "2026-01-01",
+    }
+    store["legacy-id"] = {"id": "legacy-id", "user_id": "u1", "date": "2026-01-05"}
+    store["other-user"] = {"id": "other-user", "user_id": "u2", "date": "2026-01-02"}
+
+    written = []
+    lines = [_day(f"2026-01-{day:02d}") for day in range(1, 9)]
+    # Repeats: one inside the last chunk, one of a date from the first chunk
+    lines += [_day("2026-01-08", 60), _day("2026-01-02", 90), "not json"]
+    result = await import_daily_records(
+        UploadRequest(lines), store, "u1", HealthDataCreate, on_write=written.extend
+    )
+
+    assert (result.created, result.updated, result.skipped) == (6, 4, 1)
+    records = {record["date"]: record for record in store.iter_user("u1")}
+    assert len(records) == 8
+    assert all(record["id"] == daily_record_key("u1", date) for date, record in records.items())
+    assert records["2026-01-08"]["movement_minutes"] == 60
+    assert records["2026-01-02"]["movement_minutes"] == 90
+    assert "legacy-id" not in store
+    assert store["other-user"]["date"] == "2026-01-02"
+    assert len(written) == 9
+
+
+class CountingStore(MemoryStore):
+    scans = 0
+
+    def iter_user(self, user_id):
+        self.scans += 1
+        return super().iter_user(user_id)
+
+
+def test_day_lookup_scans_only_while_legacy_records_remain():
+    store = CountingStore(f"health_{uuid.uuid4().hex}")
+    store[daily_record_key("u1", "2026-01-01")] = {
+        "id": daily_record_key("u1", "2026-01-01"), "user_id": "u1", "date": "2026-01-01",
+    }
+    store["legacy-id"] = {"id": "legacy-id", "user_id": "u1", "date": "2026-01-05"}
+
+    assert get_daily_record(store, "u1", "2026-01-01")["id"] == daily_record_key("u1", "2026-01-01")
+    assert store.scans == 0
+    assert get_daily_record(store, "u1", "2026-01-05")["id"] == "legacy-id"
+    assert get_daily_record(store, "u1", "2026-01-06") is None
+    assert store.scans == 2
+
+    # Once no legacy record is left, misses are answered without a scan
+    del store["legacy-id"]
+    assert get_daily_record(store, "u1", "2026-01-06") is None
+    assert get_daily_record(store, "u1", "2026-01-07") is None
+    assert store.scans == 3
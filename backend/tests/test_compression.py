@@ -0,0 +1,33 @@
+import httpx
+import pytest
+
+OPENAPI_URL = "/api/v1/openapi.json"
+
+
+@pytest.mark.asyncio
+async def test_large_responses_are_brotli_compressed():
+    from main import app
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get(OPENAPI_URL, headers={"Accept-Encoding": "gzip, br"})
+        assert response.headers["content-encoding"] == "br"
+        assert response.headers["vary"] == "Accept-Encoding"
+        # httpx decodes brotli bodies itself
+        assert response.json()["openapi"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("accept_encoding", ["gzip, br", "identity"])
+async def test_uncompressed_responses_still_vary_on_accept_encoding(accept_encoding):
+    from main import app
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        # Small: below COMPRESSION_MINIMUM_SIZE
+        small = await client.post("/api/v1/auth/login", json={
+            "email": "nobody@example.com", "password": "secret"
+        }, headers={"Accept-Encoding": accept_encoding})
+        assert "content-encoding" not in small.headers
+        assert small.headers["vary"] == "Accept-Encoding"
+
+        large = await client.get(OPENAPI_URL, headers={"Accept-Encoding": accept_encoding})
+        assert large.headers["vary"] == "Accept-Encoding"
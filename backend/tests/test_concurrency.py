@@ -0,0 +1,174 @@
+import asyncio
+import os
+import sqlite3
+import subprocess
+import sys
+import uuid
+
+import httpx
+import pytest
+
+from tests.conftest import BACKEND_DIR
+
+DATES = [f"2024-02-{day:02d}" for day in range(1, 29)]
+
+
+def _health(date: str, calories: int) -> dict:
+    return {
+        "hydration_level": 1.5,
+        "calories_consumed": calories,
+        "movement_minutes": 30,
+        "workout_completed": True,
+        "stress_level": 3,
+        "date": date,
+    }
+
+
+async def _signup(client: httpx.AsyncClient) -> dict:
+    response = await client.post("/api/v1/auth/signup", json={
+        "email": f"{uuid.uuid4().hex}@example.com",
+        "password": "secret",
+        "name": "Stress",
+    })
+    return {"Authorization": f"Bearer {response.json()['data']['token']}"}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_upserts_keep_one_record_per_date():
+    from main import app
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        headers = await _signup(client)
+        responses = await asyncio.gather(*(
+            client.post("/api/v1/health/", json=_health(DATES[i % 5], i), headers=headers)
+            for i in range(500)
+        ))
+        assert all(response.status_code == 200 for response in responses)
+
+        records = (await client.get("/api/v1/health/", headers=headers)).json()["data"]
+        assert sorted(record["date"] for record in records) == sorted(DATES[:5])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_goal_increments_are_not_lost():
+    from main import app
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        headers = await _signup(client)
+        goal = (await client.post("/api/v1/goals/", json={
+            "title": "Run", "target_value": 1000, "unit": "km"
+        }, headers=headers)).json()["data"]
+
+        await asyncio.gather(*(
+            client.post(f"/api/v1/goals/{goal['id']}/progress", json={"delta": 1}, headers=headers)
+            for _ in range(300)
+        ))
+
+        goals = (await client.get("/api/v1/goals/", headers=headers)).json()["data"]
+        assert goals[0]["current_value"] == 300
+
+
+# Run in separate processes sharing one SQLite store, as uvicorn workers do
+WORKER_SCRIPT = """
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from fastapi.testclient import TestClient
+from main import app
+
+# One event loop per process, like a uvicorn worker
+with TestClient(app) as client:
+    if sys.argv[1] == "signup":
+        response = client.post("/api/v1/auth/signup", json={
+            "email": "workers@example.com", "password": "secret", "name": "Workers"
+        })
+        print("token=" + response.json()["data"]["token"])
+    else:
+        headers = {"Authorization": f"Bearer {sys.argv[1]}"}
+
+        def post(day):
+            response = client.post("/api/v1/health/", headers=headers, json={
+                "hydration_level": 1.5, "calories_consumed": day, "movement_minutes": 30,
+                "workout_completed": True, "stress_level": 3, "date": f"2024-02-{day:02d}",
+            })
+            assert response.status_code == 200, response.text
+
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(post, range(1, 29)))
+"""
+
+
+def test_upserts_from_several_workers_keep_one_record_per_date(tmp_path):
+    db_path = str(tmp_path / "store.sqlite3")
+    env = {**os.environ, "SHARED_STORE_PATH": db_path, "STORE_LOG_DIR": ""}
+
+    def run(argument: str) -> subprocess.Popen:
+        return subprocess.Popen(
+            [sys.executable, "-c", WORKER_SCRIPT, argument],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+        )
+
+    signup = run("signup")
+    output, errors = signup.communicate(timeout=120)
+    assert signup.returncode == 0, errors
+    token = next(line[len("token="):] for line in output.splitlines() if line.startswith("token="))
+
+    workers = [run(token) for _ in range(4)]
+    for worker in workers:
+        _, errors = worker.communicate(timeout=120)
+        assert worker.returncode == 0, errors
+
+    with sqlite3.connect(db_path) as conn:
+        rows, dates = conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT json_extract(value, '$.date')) FROM health"
+        ).fetchone()
+    assert (rows, dates) == (28, 28)
+
+
+# A write waiting for another worker's SQLite write lock must not stall the
+# event loop (and with it every other request on the worker)
+LOCKED_WRITE_SCRIPT = """
+import asyncio, os, sqlite3, time
+import httpx
+from main import app
+
+async def main():
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/api/v1/auth/signup", json={
+            "email": "locked@example.com", "password": "secret", "name": "Locked"
+        })
+        headers = {"Authorization": f"Bearer {response.json()['data']['token']}"}
+
+        other_worker = sqlite3.connect(os.environ["SHARED_STORE_PATH"], isolation_level=None)
+        other_worker.execute("BEGIN IMMEDIATE")
+        write = asyncio.create_task(client.post(
+            "/api/v1/tasks/", json={"title": "Blocked", "priority": "low", "category": "daily"},
+            headers=headers,
+        ))
+
+        longest_tick = 0.0
+        for _ in range(50):
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            longest_tick = max(longest_tick, time.perf_counter() - started)
+        assert not write.done()
+
+        other_worker.execute("COMMIT")
+        assert (await write).status_code == 200
+        print(f"longest_tick={longest_tick}")
+
+asyncio.run(main())
+"""
+
+
+def test_write_waiting_for_the_sqlite_lock_does_not_block_the_event_loop(tmp_path):
+    env = {**os.environ, "SHARED_STORE_PATH": str(tmp_path / "store.sqlite3"), "STORE_LOG_DIR": ""}
+    result = subprocess.run(
+        [sys.executable, "-c", LOCKED_WRITE_SCRIPT],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    longest_tick = next(
+        float(line[len("longest_tick="):]) for line in result.stdout.splitlines()
+        if line.startswith("longest_tick=")
+    )
+    assert longest_tick < 0.25
@@ -0,0 +1,35 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_dashboard_while_records_are_written():
+    from main import app
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/api/v1/auth/signup", json={
+            "email": f"{uuid.uuid4().hex}@example.com",
+            "password": "secret",
+            "name": "Dashboard",
+        })
+        headers = {"Authorization": f"Bearer {response.json()['data']['token']}"}
+
+        writes = [
+            client.post("/api/v1/tasks/", json={
+                "title": f"Task {i}", "priority": "low", "category": "daily"
+            }, headers=headers)
+            for i in range(200)
+        ]
+        reads = [client.get("/api/v1/dashboard/", headers=headers) for _ in range(50)]
+        responses = await asyncio.gather(*writes, *reads)
+        assert all(response.status_code == 200 for response in responses)
+
+        dashboard = (await client.get(
+            "/api/v1/dashboard/?sections=tasks&sections=goals", headers=headers
+        )).json()["data"]
+        assert len(dashboard["tasks"]) == 200
+        assert dashboard["goals"] == []
+        assert dashboard["analytics"] is None
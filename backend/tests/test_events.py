@@ -0,0 +1,59 @@
+import asyncio
+import gc
+import uuid
+
+import pytest
+
+
+class DroppedWebSocket:
+    """A client that disconnects while a send to it is in flight"""
+
+    def __init__(self):
+        self.sending = asyncio.Event()
+
+    async def accept(self):
+        pass
+
+    async def close(self, code=None):
+        pass
+
+    async def send_json(self, data):
+        self.sending.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            raise RuntimeError("connection closed")
+
+    async def receive(self):
+        await self.sending.wait()
+        return {"type": "websocket.disconnect"}
+
+
+@pytest.mark.asyncio
+async def test_send_failing_on_disconnect_is_retrieved():
+    from app.api.v1.endpoints.auth import fake_users_db
+    from app.api.v1.endpoints.events import change_events
+    from app.core.events import hub
+    from app.core.security import create_access_token
+
+    email = f"{uuid.uuid4().hex}@example.com"
+    user = {"id": uuid.uuid4().hex, "email": email, "name": "Events"}
+    fake_users_db[email] = user
+    token = create_access_token({"sub": email})
+
+    loop = asyncio.get_running_loop()
+    errors = []
+    loop.set_exception_handler(lambda loop, context: errors.append(context))
+    try:
+        connection = asyncio.create_task(change_events(DroppedWebSocket(), token))
+        while hub.connections == 0:
+            await asyncio.sleep(0)
+        hub.publish(user["id"], {"type": "upsert", "collection": "tasks", "record": {}})
+        await asyncio.wait_for(connection, timeout=5)
+        gc.collect()
+        await asyncio.sleep(0)
+    finally:
+        loop.set_exception_handler(None)
+
+    assert hub.connections == 0
+    assert errors == []
@@ -0,0 +1,112 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.forecast import forecast_goals
+from app.core.forecast_batch import ForecastBatch
+from app.core.jobs import job_runner
+from app.core.store import MemoryStore, SQLiteStore
+from app.core.timeseries import add_point, new_series
+
+NOW = datetime(2026, 10, 19, 12)
+
+
+def _goal(goal_id: str, **fields) -> dict:
+    return {
+        "id": goal_id,
+        "user_id": "user",
+        "created_at": "2026-01-01T00:00:00",
+        "target_value": 100.0,
+        "current_value": 0.0,
+        "deadline": None,
+        **fields,
+    }
+
+
+def _series(deltas) -> dict:
+    series = new_series()
+    value = 0
+    for day, delta in enumerate(deltas):
+        value += delta
+        if delta:
+            add_point(series, NOW - timedelta(days=len(deltas) - day), delta, value)
+    return series
+
+
+def test_forecasts_follow_the_daily_rate():
+    series = _series(([2, 0, 4] * 10)[:28])
+    goals = [
+        _goal("on-pace", target_value=40, deadline=(NOW + timedelta(days=20)).isoformat() + "+00:00"),
+        _goal("no-history", created_at=NOW.isoformat(), target_value=5),
+        _goal("done", target_value=10, current_value=12, deadline=(NOW + timedelta(days=1)).isoformat()),
+        _goal("overdue", target_value=40, deadline=(NOW - timedelta(days=1)).isoformat()),
+    ]
+    forecasts = {
+        forecast["id"]: forecast
+        for forecast in forecast_goals(
+            [(goals[0], series), (goals[1], None), (goals[2], series), (goals[3], series)],
+            NOW.isoformat()
+        )
+    }
+
+    assert forecasts["on-pace"]["daily_rate"] == pytest.approx(2.0)
+    assert forecasts["on-pace"]["projected_completion"].startswith("2026-11-08T12:00:00")
+    assert forecasts["on-pace"]["deadline_probability"] == pytest.approx(0.5)
+
+    assert forecasts["no-history"]["daily_rate"] == 0
+    assert forecasts["no-history"]["projected_completion"] is None
+    assert forecasts["no-history"]["deadline_probability"] is None
+
+    assert forecasts["done"]["deadline_probability"] == 1.0
+    assert forecasts["overdue"]["deadline_probability"] == 0.0
+
+
+def test_rate_counts_days_since_creation_only():
+    created = NOW - timedelta(days=2)
+    series = new_series()
+    add_point(series, created + timedelta(hours=1), 3, 3)
+    add_point(series, created + timedelta(days=1, hours=1), 3, 6)
+    forecast, = forecast_goals(
+        [(_goal("new", created_at=created.isoformat(), current_value=6), series)], NOW.isoformat()
+    )
+    assert forecast["daily_rate"] == pytest.approx(3.0)
+    assert forecast["daily_rate_stddev"] == pytest.approx(0.0)
+
+
+def test_store_get_many(tmp_path):
+    for store in (MemoryStore("records"), SQLiteStore("records", str(tmp_path / "store.sqlite3"))):
+        store.put_many({f"r{i}": {"id": f"r{i}", "user_id": "user"} for i in range(1200)})
+        found = store.get_many(["r0", "r1199", "missing"] + [f"r{i}" for i in range(600, 700)])
+        assert set(found) == {"r0", "r1199"} | {f"r{i}" for i in range(600, 700)}
+
+
+@pytest.mark.asyncio
+async def test_batch_forecasts_every_goal_in_chunks(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "FORECAST_CHUNK_SIZE", 7)
+    goals, progress, forecasts = MemoryStore("goals"), MemoryStore("progress"), MemoryStore("forecasts")
+    for i in range(20):
+        goals[f"g{i}"] = _goal(f"g{i}", current_value=i)
+        progress[f"g{i}"] = {"id": f"g{i}", "user_id": "user", "series": _series([1] * 5)}
+
+    await job_runner.start()
+    try:
+        batch = ForecastBatch(goals, progress, forecasts, MemoryStore("runs"))
+        assert await batch.run(NOW) == 20
+    finally:
+        await job_runner.stop()
+
+    assert len(forecasts) == 20
+    assert all(forecast["daily_rate"] > 0 for forecast in forecasts.values())
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_iter_pages_walks_the_whole_collection(kind, tmp_path):
+    store = MemoryStore("pages") if kind == "memory" else SQLiteStore("pages", str(tmp_path / "s.db"))
+    store.put_many({f"r{i:04d}": {"id": f"r{i:04d}", "user_id": f"u{i % 3}"} for i in range(25)})
+
+    pages = list(store.iter_pages(10))
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert sorted(record["id"] for page in pages for record in page) == [f"r{i:04d}" for i in range(25)]
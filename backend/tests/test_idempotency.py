@@ -0,0 +1,111 @@
+import asyncio
+import hashlib
+import time
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from app.core.idempotency import IdempotencyCache
+from app.core.store import MemoryStore, SQLiteStore
+
+
+class Payload(BaseModel):
+    title: str
+
+
+class Response(BaseModel):
+    id: int
+
+
+def _handler(calls: list, delay: float = 0.0):
+    async def handler():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return Response(id=len(calls))
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_concurrent_retries_in_one_worker_execute_once():
+    cache = IdempotencyCache(MemoryStore("keys"), ttl=60, lease=60)
+    calls = []
+    responses = await asyncio.gather(*(
+        cache.run(("user", "create"), "key", Payload(title="a"), _handler(calls, 0.05))
+        for _ in range(10)
+    ))
+    assert calls == [1]
+    assert {response.id for response in responses} == {1}
+
+    replay = await cache.run(("user", "create"), "key", Payload(title="a"), _handler(calls))
+    assert replay == {"id": 1}
+    assert calls == [1]
+
+
+@pytest.mark.asyncio
+async def test_retry_on_another_worker_is_replayed(tmp_path):
+    path = str(tmp_path / "store.sqlite3")
+    first = IdempotencyCache(SQLiteStore("keys", path), ttl=60, lease=60)
+    second = IdempotencyCache(SQLiteStore("keys", path), ttl=60, lease=60)
+    calls = []
+
+    original = asyncio.create_task(
+        first.run(("user", "create"), "key", Payload(title="a"), _handler(calls, 0.2))
+    )
+    # Let the first worker claim the key before the retry reaches the second
+    while not first._inflight:
+        await asyncio.sleep(0.01)
+    retry = await second.run(("user", "create"), "key", Payload(title="a"), _handler(calls))
+    original = await original
+    assert calls == [1]
+    assert original == Response(id=1)
+    assert retry == {"id": 1}
+
+
+@pytest.mark.asyncio
+async def test_key_reused_with_a_different_payload_is_rejected():
+    cache = IdempotencyCache(MemoryStore("keys"), ttl=60, lease=60)
+    await cache.run(("user", "create"), "key", Payload(title="a"), _handler([]))
+    with pytest.raises(HTTPException) as error:
+        await cache.run(("user", "create"), "key", Payload(title="b"), _handler([]))
+    assert error.value.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_failed_requests_are_not_remembered():
+    cache = IdempotencyCache(MemoryStore("keys"), ttl=60, lease=60)
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await cache.run(("user", "create"), "key", Payload(title="a"), fail)
+    calls = []
+    response = await cache.run(("user", "create"), "key", Payload(title="a"), _handler(calls))
+    assert response == Response(id=1)
+
+
+@pytest.mark.asyncio
+async def test_abandoned_claim_is_taken_over():
+    cache = IdempotencyCache(MemoryStore("keys"), ttl=60, lease=60)
+    calls = []
+    await cache.run(("user", "create"), "key", Payload(title="a"), _handler(calls))
+
+    # As if the worker running the request died before completing it
+    for record in cache.store.values():
+        record.update(status="running", lease_expires_at=time.time() - 1)
+
+    response = await cache.run(("user", "create"), "key", Payload(title="a"), _handler(calls))
+    assert response == Response(id=2)
+    assert cache.purge_expired(time.time() + 120) == 1
+
+
+@pytest.mark.asyncio
+async def test_keys_expire_after_the_ttl_given_to_run():
+    cache = IdempotencyCache(MemoryStore("keys"), ttl=60, lease=60)
+    await cache.run(("user", "signup"), "key", Payload(title="a"), _handler([]), ttl=5)
+    [record] = cache.store.values()
+    assert record["expires_at"] <= time.time() + 5
+    # Keyed, not a plain hash of the body
+    assert record["fingerprint"] != hashlib.sha256(b'{"title": "a"}').hexdigest()
+    assert cache.purge_expired(time.time() + 10) == 1
@@ -0,0 +1,49 @@
+import asyncio
+import multiprocessing
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.job_functions import run_job
+from app.core.jobs import JobRunner
+from app.core.store import MemoryStore
+from tests.conftest import BACKEND_DIR
+
+
+def test_worker_module_opens_no_stores():
+    script = "import sys, app.core.job_functions; print('app.core.store' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "False"
+
+
+def test_jobs_run_in_forkserver_workers():
+    context = multiprocessing.get_context("forkserver")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        result = pool.submit(run_job, "task_analytics", {"tasks": []}).result(timeout=60)
+    assert result["completion_rate"] == 0
+
+
+@pytest.mark.asyncio
+async def test_finished_jobs_drop_their_input_and_expire():
+    runner = JobRunner(MemoryStore("jobs"), workers=1)
+    await runner.start()
+    try:
+        job = await runner.submit("user", "task_analytics", "normal", {"tasks": []})
+        for _ in range(600):
+            if runner.store[job["id"]]["status"] == "succeeded":
+                break
+            await asyncio.sleep(0.05)
+        finished = runner.store[job["id"]]
+        assert finished["status"] == "succeeded"
+        assert finished["args"] is None
+
+        assert runner.purge_finished(datetime.utcnow()) == 0
+        assert runner.purge_finished(datetime.utcnow() + timedelta(days=30)) == 1
+        assert job["id"] not in runner.store
+    finally:
+        await runner.stop()
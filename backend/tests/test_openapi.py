@@ -0,0 +1,43 @@
+import json
+
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from app.core import openapi
+from app.core.config import settings
+
+
+def _app() -> FastAPI:
+    class Item(BaseModel):
+        name: str
+
+    app = FastAPI(version="1.0.0")
+
+    @app.get("/items", response_model=Item)
+    def get_item():
+        return Item(name="item")
+
+    openapi.install_cached_openapi(app)
+    return app
+
+
+def test_cached_document_is_rebuilt_when_source_changes(tmp_path, monkeypatch):
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "schemas.py").write_text("class Item: pass\n")
+    cache_path = tmp_path / "openapi.json"
+    monkeypatch.setattr(openapi, "SOURCE_DIR", str(source))
+    monkeypatch.setattr(settings, "OPENAPI_CACHE_PATH", str(cache_path))
+
+    document = _app().openapi()
+    assert json.loads(cache_path.read_text())["schema"] == document
+
+    # A stale document under the current fingerprint is served as is
+    cached = json.loads(cache_path.read_text())
+    cached["schema"]["info"]["title"] = "From cache"
+    cache_path.write_text(json.dumps(cached))
+    assert _app().openapi()["info"]["title"] == "From cache"
+
+    # Any source change (e.g. a new model field) invalidates it
+    (source / "schemas.py").write_text("class Item:\n    forecast = None\n")
+    assert _app().openapi()["info"]["title"] == "FastAPI"
@@ -0,0 +1,59 @@
+import uuid
+
+import httpx
+import pytest
+
+
+def _health(date: str, calories: int) -> dict:
+    return {
+        "hydration_level": 1.5,
+        "calories_consumed": calories,
+        "movement_minutes": 30,
+        "workout_completed": True,
+        "stress_level": 3,
+        "date": date,
+    }
+
+
+@pytest.mark.asyncio
+async def test_rollups_include_days_stored_before_rollups_existed():
+    from main import app
+    from app.api.v1.endpoints.auth import fake_users_db
+    from app.api.v1.endpoints.health import fake_health_db
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        email = f"{uuid.uuid4().hex}@example.com"
+        response = await client.post("/api/v1/auth/signup", json={
+            "email": email, "password": "secret", "name": "Rollups"
+        })
+        headers = {"Authorization": f"Bearer {response.json()['data']['token']}"}
+        user = fake_users_db[email]
+
+        # Stored directly, as by a version without rollups
+        for day, calories in ((1, 100), (2, 300)):
+            record_id = str(uuid.uuid4())
+            fake_health_db[record_id] = {
+                "id": record_id, "user_id": user["id"], **_health(f"2024-03-{day:02d}", calories)
+            }
+
+        # A correction and a new day, posted before the first rollup read
+        await client.post("/api/v1/health/", json=_health("2024-03-02", 200), headers=headers)
+        await client.post("/api/v1/health/", json=_health("2024-03-03", 600), headers=headers)
+
+        rollups = (await client.get(
+            "/api/v1/health/rollup?period=month", headers=headers
+        )).json()["data"]
+        assert [rollup["bucket"] for rollup in rollups] == ["2024-03"]
+        assert rollups[0]["metrics"]["calories_consumed"] == {
+            "sum": 900.0, "mean": 300.0, "min": 100.0, "max": 600.0, "count": 3
+        }
+
+        await client.post("/api/v1/health/import", content="\n".join([
+            '{"hydration_level": 1, "calories_consumed": 50, "movement_minutes": 1, '
+            '"workout_completed": false, "stress_level": 1, "date": "2024-03-01"}'
+        ]), headers=headers)
+        rollups = (await client.get(
+            "/api/v1/health/rollup?period=week&start=2024-02-26&end=2024-03-03", headers=headers
+        )).json()["data"]
+        assert [rollup["bucket"] for rollup in rollups] == ["2024-W09"]
+        assert rollups[0]["metrics"]["calories_consumed"]["min"] == 50.0
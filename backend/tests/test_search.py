@@ -0,0 +1,43 @@
+import threading
+
+import pytest
+
+from app.core.search import SearchIndex
+
+
+def _tasks(*titles):
+    return [("tasks", {"id": str(i), "title": title, "description": None}) for i, title in enumerate(titles)]
+
+
+@pytest.mark.asyncio
+async def test_partition_is_built_off_the_event_loop_and_kept():
+    index = SearchIndex(max_users=10)
+    loads = []
+
+    def load():
+        loads.append(threading.current_thread() is threading.main_thread())
+        return _tasks("Write report", "Water plants")
+
+    results = await index.search("user", "wr", 10, lambda: 1, load)
+    assert [result["title"] for result in results] == ["Write report"]
+    await index.search("user", "water", 10, lambda: 1, load)
+    assert loads == [False]
+
+
+@pytest.mark.asyncio
+async def test_partition_changed_during_its_build_is_not_kept():
+    index = SearchIndex(max_users=10)
+    version = 1
+    loads = 0
+
+    def load():
+        nonlocal version, loads
+        loads += 1
+        # Another request publishes a change while the partition is built
+        version += 1
+        return _tasks("Write report")
+
+    results = await index.search("user", "report", 10, lambda: version, load)
+    assert len(results) == 1
+    await index.search("user", "report", 10, lambda: version, load)
+    assert loads == 2
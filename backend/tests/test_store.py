@@ -0,0 +1,128 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from app.core.store import LoggedMemoryStore, MemoryStore
+from tests.conftest import BACKEND_DIR
+
+
+def test_for_user_while_another_thread_writes():
+    store = MemoryStore("records")
+    stop = threading.Event()
+
+    def write():
+        i = 0
+        while not stop.is_set():
+            key = f"record-{i % 10000}"
+            if key in store:
+                del store[key]
+            else:
+                store[key] = {"id": key, "user_id": "user"}
+            i += 1
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        for _ in range(300):
+            store.for_user("user")
+            store.values()
+    finally:
+        stop.set()
+        writer.join()
+
+
+def _logged(directory) -> LoggedMemoryStore:
+    return LoggedMemoryStore("records", str(directory))
+
+
+def test_logged_store_recovers_from_the_log(tmp_path):
+    store = _logged(tmp_path)
+    store["a"] = {"id": "a", "user_id": "user", "value": 1}
+    store["b"] = {"id": "b", "user_id": "user", "value": 2}
+    store.apply("a", lambda record: record.update(value=3))
+    del store["b"]
+    store.close()
+
+    store = _logged(tmp_path)
+    assert dict(store) == {"a": {"id": "a", "user_id": "user", "value": 3}}
+    store.close()
+
+
+def test_acknowledged_writes_survive_a_killed_process(tmp_path):
+    script = (
+        "import os, signal, sys\n"
+        "from app.core.store import LoggedMemoryStore\n"
+        "store = LoggedMemoryStore('records', sys.argv[1])\n"
+        "store['a'] = {'id': 'a', 'user_id': 'user'}\n"
+        "os.kill(os.getpid(), signal.SIGKILL)\n"
+    )
+    subprocess.run([sys.executable, "-c", script, str(tmp_path)], cwd=BACKEND_DIR, env={
+        **os.environ, "STORE_FSYNC_INTERVAL_MS": "60000"
+    })
+
+    store = _logged(tmp_path)
+    assert set(store) == {"a"}
+    store.close()
+
+
+def test_torn_log_tail_is_ignored(tmp_path):
+    store = _logged(tmp_path)
+    store["a"] = {"id": "a", "user_id": "user"}
+    store["b"] = {"id": "b", "user_id": "user"}
+    store.close()
+
+    # Cut the last record in half, as a crash mid-append would
+    log_path = sorted(tmp_path.glob("records.*.log"))[-1]
+    data = log_path.read_bytes()
+    log_path.write_bytes(data[:-5])
+
+    store = _logged(tmp_path)
+    assert set(store) == {"a"}
+    store["c"] = {"id": "c", "user_id": "user"}
+    store.close()
+
+    store = _logged(tmp_path)
+    assert set(store) == {"a", "c"}
+    store.close()
+
+
+def test_snapshot_compacts_logs_and_recovers(tmp_path):
+    store = _logged(tmp_path)
+    for i in range(10):
+        store[f"r{i}"] = {"id": f"r{i}", "user_id": "user", "value": i}
+    store.snapshot()
+    store["r0"] = {"id": "r0", "user_id": "user", "value": 100}
+    del store["r1"]
+    store.close()
+
+    assert len(list(tmp_path.glob("records.*.log"))) == 1
+    store = _logged(tmp_path)
+    assert len(store) == 9
+    assert store["r0"]["value"] == 100
+    store.close()
+
+
+def test_crash_while_writing_a_snapshot(tmp_path):
+    store = _logged(tmp_path)
+    store["a"] = {"id": "a", "user_id": "user"}
+    store.close()
+
+    # A half-written snapshot never replaced the real one
+    (tmp_path / "records.snap.tmp").write_bytes(b"CSSNAP01\x00")
+
+    store = _logged(tmp_path)
+    assert set(store) == {"a"}
+    assert not (tmp_path / "records.snap.tmp").exists()
+    store.close()
+
+
+def test_collection_can_only_be_opened_once(tmp_path):
+    store = _logged(tmp_path)
+    with pytest.raises(RuntimeError):
+        _logged(tmp_path)
+    store.close()
+
+    _logged(tmp_path).close()
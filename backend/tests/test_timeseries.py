@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta
+
+from app.core.timeseries import add_point, new_series, series_points
+
+
+def test_out_of_order_points_are_kept_in_time_order():
+    series = new_series()
+    start = datetime(2024, 1, 1, 12)
+    add_point(series, start, 1, 1)
+    add_point(series, start + timedelta(seconds=2), 1, 3)
+    add_point(series, start + timedelta(seconds=1), 1, 2)
+
+    assert [point["value"] for point in series["raw"]] == [1, 2, 3]
+
+
+def test_late_point_does_not_stop_older_points_from_folding():
+    series = new_series()
+    start = datetime(2024, 1, 1, 12)
+    add_point(series, start, 1, 1)
+    add_point(series, start + timedelta(hours=2), 1, 3)
+    add_point(series, start + timedelta(hours=1), 1, 2)
+    add_point(series, start + timedelta(days=2), 1, 4)
+
+    assert [point["value"] for point in series["raw"]] == [4]
+    points = series_points(series)
+    assert [point["value"] for point in points] == [1, 2, 3, 4]
+    assert [point["resolution"] for point in points] == ["hourly", "hourly", "hourly", "raw"]